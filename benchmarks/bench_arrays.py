@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# Compares numeric samples stored as a list (NestedList) and as a typed array (NestedArray, 
+# NestedNdarray if NumPy is installed): memory, adding samples in blocks, elementwise updates 
+# and serialization (stringify() and push() with the binary backend).
+#
+# python benchmarks/bench_arrays.py
+
+import os
+import sys
+import time
+import array
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import dicta
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SAMPLES = 1000000
+BLOCK = 1000
+
+def samples(kind):
+    values = [i * 0.5 for i in range(SAMPLES)]
+    if kind == "list":
+        return values
+    elif kind == "array":
+        return array.array("d", values)
+    return numpy.array(values)
+
+def best(function, repeat=3):
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def measure(kind, tmp):
+    # the memory of the numbers and of the node that holds them
+    tracemalloc.start()
+    data = samples(kind)
+    block = data[:BLOCK].copy() if kind == "numpy" else data[:BLOCK]
+    d = dicta.Dicta(samples=data)
+    del data
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    node = d["samples"]
+    results = {"memory MB": memory / 1e6}
+    if kind != "numpy":
+        results["extend us"] = best(lambda: [node.extend(block) for i in range(10)]) / 10 * 1e6
+        del node[SAMPLES:]
+        results["update ms"] = best(lambda: node.__setitem__(slice(None), [x * 2 for x in node])) * 1e3
+    else:
+        results["update ms"] = best(lambda: node.__imul__(2)) * 1e3
+    results["stringify ms"] = best(lambda: (d.set_serializer(False), d.stringify())) * 1e3
+    d.set_backend("binary")
+    path = os.path.join(tmp, "samples.bin")
+    results["push ms"] = best(lambda: d.push(path)) * 1e3
+    results["file MB"] = os.path.getsize(path) / 1e6
+    return results
+
+if __name__ == "__main__":
+    kinds = ["list", "array"] + (["numpy"] if numpy is not None else [])
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = {kind: measure(kind, tmp) for kind in kinds}
+    columns = ["memory MB", "extend us", "update ms", "stringify ms", "push ms", "file MB"]
+    print("{:>8}".format("") + "".join("{:>14}".format(column) for column in columns))
+    for kind, results in rows.items():
+        print("{:>8}".format(kind) + "".join("{:>14.2f}".format(results[column]) if column in results else "{:>14}".format("-") for column in columns))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# Compares the serializer backends: time to encode and decode the data and the size of the
+# encoded data, for plain JSON data and for data with binary payloads (bytes and sets).
+#
+# python benchmarks/bench_backends.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import dicta
+
+RECORDS = 25000
+REPEAT = 5
+
+def plain_data():
+    return {"records": [{"id": i, "name": "record %d" % i, "value": i / 3} for i in range(RECORDS)]}
+
+def binary_data():
+    return {"records": [{"id": i, "blob": os.urandom(256), "tags": {"a", "b", i}} for i in range(RECORDS // 10)]}
+
+def timed(func):
+    start = time.perf_counter()
+    for i in range(REPEAT):
+        result = func()
+    return (time.perf_counter() - start) / REPEAT, result
+
+def measure(name, data):
+    d = dicta.Dicta(data)
+    d.set_serializer(True)
+    d.set_backend(name)
+    backend = dicta.backends[name]
+    def encode():
+        # drop the cached fragments, so the json backend encodes everything
+        d.set_serializer(True)
+        return backend.encode(d)
+    encode_time, encoded = timed(encode)
+    if isinstance(encoded, str):
+        encoded = encoded.encode()
+    decode_time, decoded = timed(lambda: backend.decode(encoded, d))
+    return encode_time, decode_time, len(encoded)
+
+if __name__ == "__main__":
+    names = [name for name in dicta.backends if name != "orjson" or dicta.dicta.orjson is not None]
+    for title, build in (("plain", plain_data), ("binary payloads", binary_data)):
+        print(title)
+        print("{:>10} {:>12} {:>12} {:>12} {:>12}".format("backend", "ms encode", "ms decode", "KB", "MB/s decode"))
+        for name in names:
+            encode_time, decode_time, size = measure(name, build())
+            print("{:>10} {:>12.1f} {:>12.1f} {:>12.1f} {:>12.1f}".format(name, encode_time * 1e3, decode_time * 1e3, size / 1e3, size / decode_time / 1e6))
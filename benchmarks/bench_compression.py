@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# Measures push() and pull() of a repetitive document with every compression of Dicta.set_compression():
+# the size of the file, the time to write and read it and the peak memory of the write.
+#
+# python benchmarks/bench_compression.py
+
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import dicta
+
+RECORDS = [10000, 100000]
+COMPRESSIONS = [None, "gzip", "zlib", "lzma"]
+REPEAT = 3
+
+def data(records):
+    return {"records": [{"id": i, "name": "record %d" % (i % 100), "state": {"active": True, "tags": ["a", "b"], "value": i % 7}} for i in range(records)]}
+
+def measure(d, path):
+    write = read = None
+    for i in range(REPEAT):
+        start = time.perf_counter()
+        d.push(path)
+        write = min(write or 1e9, time.perf_counter() - start)
+        start = time.perf_counter()
+        dicta.Dicta().pull(path)
+        read = min(read or 1e9, time.perf_counter() - start)
+    # the fragments are cached by the first push, the peak is the memory used by the write itself
+    tracemalloc.start()
+    d.push(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return os.path.getsize(path), write, read, peak
+
+if __name__ == "__main__":
+    print("{:>8} {:>8} {:>12} {:>10} {:>10} {:>12}".format("records", "compr.", "file KB", "write ms", "read ms", "peak KB"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for records in RECORDS:
+            for compression in COMPRESSIONS:
+                d = dicta.Dicta(data(records))
+                d.set_compression(compression)
+                size, write, read, peak = measure(d, os.path.join(tmp, "data.json"))
+                print("{:>8} {:>8} {:>12.0f} {:>10.1f} {:>10.1f} {:>12.0f}".format(records, compression or "none", size / 1024, write * 1e3, read * 1e3, peak / 1024))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# Measures loading files written with Dicta.set_serializer(True) (serialized objects, tuples and sets):
+# a deep document (nested dicts) and a wide document (many records), with the json and orjson backends.
+#
+# python benchmarks/bench_deserialize.py
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import dicta
+
+DEPTHS = [50, 100, 200]
+RECORDS = [10000, 100000]
+REPEAT = 3
+
+def deep(depth):
+    node = {"leaf": complex(1, 2), "tags": {1, 2}, "pair": (1, 2)}
+    for i in range(depth):
+        node = {"level": i, "child": node, "items": [i, {"x": i}]}
+    return node
+
+def wide(records):
+    return {"records": [{"id": i, "pair": (i, i + 1), "tags": {i}, "value": complex(i, 1)} for i in range(records)]}
+
+def measure(data, path, backend):
+    d = dicta.Dicta()
+    d.set_serializer(True)
+    d.set_backend(backend)
+    d.update(data)
+    d.push(path)
+    start = time.perf_counter()
+    for i in range(REPEAT):
+        loaded = dicta.Dicta()
+        loaded.set_serializer(True)
+        loaded.set_backend(backend)
+        loaded.pull(path)
+    return (time.perf_counter() - start) / REPEAT
+
+if __name__ == "__main__":
+    backends = ["json"] + (["orjson"] if dicta.dicta.orjson is not None else [])
+    print("{:>8} {:>10} {:>10} {:>12}".format("backend", "document", "size", "ms load"))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.json")
+        for backend in backends:
+            for depth in DEPTHS:
+                print("{:>8} {:>10} {:>10} {:>12.2f}".format(backend, "deep", depth, measure(deep(depth), path, backend) * 1e3))
+            for records in RECORDS:
+                print("{:>8} {:>10} {:>10} {:>12.2f}".format(backend, "wide", records, measure(wide(records), path, backend) * 1e3))
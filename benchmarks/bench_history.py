@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# Measures the memory and time of keeping a history of snapshots (Dicta.snapshot()) of a large tree,
+# where one record changes between snapshots, compared to keeping a full copy (dictify()) per version.
+#
+# python benchmarks/bench_history.py
+
+import os
+import sys
+import gc
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import dicta
+
+RECORDS = 25000
+VERSIONS = 100
+
+def build():
+    # every record holds 4 nodes: the dict and its three values
+    return dicta.Dicta(records=[{"id": i, "name": "record %d" % i, "value": 0} for i in range(RECORDS)])
+
+def measure(keep):
+    d = build()
+    records = d["records"]
+    d.set_history(VERSIONS)
+    versions = []
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(VERSIONS):
+        records[i * 97 % RECORDS]["value"] = i
+        versions.append(keep(d))
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / VERSIONS, elapsed / VERSIONS
+
+if __name__ == "__main__":
+    print("{} nodes, {} versions".format(RECORDS * 4, VERSIONS))
+    print("{:>12} {:>16} {:>14}".format("", "KB per version", "ms per version"))
+    for name, keep in (("dictify()", lambda d: d.dictify()), ("snapshot()", lambda d: d.snapshot())):
+        size, elapsed = measure(keep)
+        print("{:>12} {:>16.1f} {:>14.2f}".format(name, size / 1024, elapsed * 1e3))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# Compares looking up records by a field with Dicta.find() with and without an index (see
+# Dicta.create_index()), range queries with an ordered index and the cost of keeping the
+# indexes up to date on appends and field updates.
+#
+# python benchmarks/bench_index.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import dicta
+
+RECORDS = [1000, 10000, 100000]
+LOOKUPS = 100
+WRITES = 10000
+
+def build(size, indexed):
+    d = dicta.Dicta(entities={"persons": [{"id": i, "name": "person %d" % i, "age": i % 100} for i in range(size)]})
+    if indexed:
+        d.create_index("/entities/persons", "name")
+        d.create_index("/entities/persons", "age", ordered=True)
+    return d
+
+def best(function, repeat=3):
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def measure(size, indexed):
+    d = build(size, indexed)
+    persons = d["entities"]["persons"]
+    names = ["person %d" % (i * size // LOOKUPS) for i in range(LOOKUPS)]
+    results = {}
+    results["find us"] = best(lambda: [d.find("/entities/persons", name=name) for name in names]) / LOOKUPS * 1e6
+    results["range us"] = best(lambda: d.find_range("/entities/persons", "age", 10, 10)) * 1e6
+    results["append us"] = best(lambda: [persons.append({"id": -1, "name": "new", "age": 0}) for i in range(WRITES)]) / WRITES * 1e6
+    del persons[size:]
+    n = len(persons)
+    results["setitem us"] = best(lambda: [persons[i % n].__setitem__("name", "renamed %d" % i) for i in range(WRITES)]) / WRITES * 1e6
+    return results
+
+if __name__ == "__main__":
+    columns = ["find us", "range us", "append us", "setitem us"]
+    print("{:>8} {:>8}".format("records", "index") + "".join("{:>14}".format(column) for column in columns))
+    for size in RECORDS:
+        for indexed in (False, True):
+            results = measure(size, indexed)
+            print("{:>8} {:>8}".format(size, "yes" if indexed else "no") + "".join("{:>14.2f}".format(results[column]) for column in columns))
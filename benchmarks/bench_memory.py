@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# Measures the memory per nested object (dict, list, tuple, set) held by Dicta
+# compared to the same plain container.
+#
+# python benchmarks/bench_memory.py
+
+import os
+import sys
+import gc
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import dicta
+
+NODES = 100000
+
+# small containers with cached ints, so only the containers themselves are measured
+KINDS = {
+    "dict": lambda i: {"a": i % 256},
+    "list": lambda i: [i % 256],
+    "tuple": lambda i: (i % 256, ),
+    "set": lambda i: {i % 256},
+}
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return size / NODES
+
+if __name__ == "__main__":
+    print("{:>8} {:>14} {:>14} {:>14}".format("type", "bytes plain", "bytes dicta", "overhead"))
+    for kind, make in KINDS.items():
+        plain = measure(lambda: [make(i) for i in range(NODES)])
+        nested = measure(lambda: dicta.Dicta(items=[make(i) for i in range(NODES)]))
+        print("{:>8} {:>14.1f} {:>14.1f} {:>14.1f}".format(kind, plain, nested, nested - plain))
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# Measures the latency of a nested write (Dicta["records"][i]["value"] = x)
+# depending on the size of the data tree.
+#
+# python benchmarks/bench_nested_write.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import dicta
+
+SIZES = [100, 1000, 10000, 100000]
+WRITES = 1000
+
+def build(size):
+    # every record holds 3 nodes: the dict and its two values
+    records = [{"id": i, "value": 0} for i in range(size // 3)]
+    d = dicta.Dicta(records=records)
+    d.bind_callback(lambda: None)
+    return d
+
+def measure(d):
+    records = d["records"]
+    n = len(records)
+    start = time.perf_counter()
+    for i in range(WRITES):
+        records[i % n]["value"] = i
+    return (time.perf_counter() - start) / WRITES
+
+if __name__ == "__main__":
+    print("{:>10} {:>16}".format("nodes", "us/nested write"))
+    for size in SIZES:
+        latency = measure(build(size))
+        print("{:>10} {:>16.2f}".format(size, latency * 1e6))
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# Measures the export time after a one-key change compared to a full dump,
+# depending on the size of the data tree.
+#
+# python benchmarks/bench_serialize.py
+
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import dicta
+
+SIZES = [1000, 10000, 100000]
+REPEAT = 20
+
+def build(size):
+    # every record holds 4 nodes: the dict and its three values
+    records = [{"id": i, "name": "record %d" % i, "value": 0} for i in range(size // 4)]
+    return dicta.Dicta(records=records)
+
+def timed(func):
+    start = time.perf_counter()
+    for i in range(REPEAT):
+        func(i)
+    return (time.perf_counter() - start) / REPEAT
+
+if __name__ == "__main__":
+    print("{:>10} {:>14} {:>14} {:>14}".format("nodes", "ms full dump", "ms cold", "ms one change"))
+    for size in SIZES:
+        d = build(size)
+        records = d["records"]
+        full = timed(lambda i: json.dumps(d.dictify()))
+        def cold(i):
+            d.set_serializer(False)
+            d.stringify()
+        cold_time = timed(cold)
+        def one_change(i):
+            records[i]["value"] = i
+            d.stringify()
+        incremental = timed(one_change)
+        print("{:>10} {:>14.2f} {:>14.2f} {:>14.2f}".format(size, full * 1e3, cold_time * 1e3, incremental * 1e3))
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# Measures the hot paths of Dicta (modifications, construction, loading, sync file writes and
+# serialization) for data trees of 1e2 to 1e6 nodes. The results are written as JSON, so the
+# results of two commits can be compared.
+#
+# python benchmarks/bench_suite.py --output before.json
+# python benchmarks/bench_suite.py --output after.json --compare before.json
+# python benchmarks/bench_suite.py --sizes 100 10000 --only nested_setitem stringify
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import dicta
+
+SIZES = [100, 1000, 10000, 100000, 1000000]
+ROUNDS = 3
+MIN_TIME = 0.2
+
+# ------------------------------------------------------------ Data
+
+def plain_data(size, binary=False):
+    '''About 'size' nodes: every record holds 4 nodes, the dict and its three values'''
+    records = [{"id": i, "name": "record %d" % i, "value": 0} for i in range(max(size // 4, 1))]
+    if binary:
+        # every tenth record holds an object that is only serializable by the binary serializer
+        for record in records[::10]:
+            record["value"] = complex(record["id"], 1)
+    return {"records": records, "items": [], "value": 0}
+
+def build(size, binary=False):
+    d = dicta.Dicta(plain_data(size, binary))
+    if binary:
+        d.set_serializer(True)
+    return d
+
+# ------------------------------------------------------------ Benchmarks
+# Every benchmark takes the tree size and a temp directory and returns a function that runs
+# one operation. The operation gets a running counter.
+
+def dicta_setitem(size, tmp):
+    d = build(size)
+    def op(i):
+        d["value"] = i
+    return op
+
+def nested_setitem(size, tmp):
+    d = build(size)
+    records = d["records"]
+    n = len(records)
+    def op(i):
+        records[i % n]["value"] = i
+    return op
+
+def list_append(size, tmp):
+    items = build(size)["items"]
+    def op(i):
+        items.append(i)
+    return op
+
+def list_extend(size, tmp):
+    items = build(size)["items"]
+    chunk = list(range(10))
+    def op(i):
+        items.extend(chunk)
+    return op
+
+def list_insert(size, tmp):
+    # insert into the middle of the list of records, which renumbers the following records.
+    # The last record is removed again, so the size of the tree stays the same.
+    records = build(size)["records"]
+    def op(i):
+        records.insert(len(records) // 2, {"id": i, "name": "inserted", "value": 0})
+        records.pop()
+    return op
+
+def set_add(size, tmp):
+    # sets are only serializable by the binary serializer, so they are not part of the other trees
+    d = build(size)
+    d["tags"] = set()
+    tags = d["tags"]
+    def op(i):
+        tags.add(i)
+    return op
+
+def construct(size, tmp):
+    data = plain_data(size)
+    def op(i):
+        dicta.Dicta(data)
+    return op
+
+def bind_file_load(size, tmp):
+    path = os.path.join(tmp, "load.json")
+    build(size).push(path)
+    def op(i):
+        dicta.Dicta().bind_file(path)
+    return op
+
+def pull_load(size, tmp):
+    path = os.path.join(tmp, "load.json")
+    build(size).push(path)
+    d = dicta.Dicta()
+    def op(i):
+        d.pull(path)
+    return op
+
+def sync_write(size, tmp):
+    d = build(size)
+    d.bind_file(os.path.join(tmp, "sync.json"), reset=True)
+    records = d["records"]
+    n = len(records)
+    def op(i):
+        records[i % n]["value"] = i
+    return op
+
+def stringify(size, tmp):
+    d = build(size)
+    d.stringify()
+    def op(i):
+        d.set_serializer(False)
+        d.stringify()
+    return op
+
+def stringify_binary(size, tmp):
+    d = build(size, binary=True)
+    d.stringify()
+    def op(i):
+        d.set_serializer(True)
+        d.stringify()
+    return op
+
+def dictify(size, tmp):
+    d = build(size)
+    def op(i):
+        d.dictify()
+    return op
+
+BENCHMARKS = {
+    "dicta_setitem": dicta_setitem,
+    "nested_setitem": nested_setitem,
+    "list_append": list_append,
+    "list_extend": list_extend,
+    "list_insert": list_insert,
+    "set_add": set_add,
+    "construct": construct,
+    "bind_file_load": bind_file_load,
+    "pull_load": pull_load,
+    "sync_write": sync_write,
+    "stringify": stringify,
+    "stringify_binary": stringify_binary,
+    "dictify": dictify,
+}
+
+# ------------------------------------------------------------ Runner
+
+def measure(benchmark, size, rounds=ROUNDS, min_time=MIN_TIME):
+    '''Returns the best time per operation of all rounds. Every round repeats the operation
+    until it took 'min_time' seconds.'''
+    with tempfile.TemporaryDirectory() as tmp:
+        op = benchmark(size, tmp)
+        op(0)
+        count = 1
+        i = 1
+        best = None
+        for r in range(rounds):
+            while True:
+                start = time.perf_counter()
+                for n in range(count):
+                    op(i + n)
+                elapsed = time.perf_counter() - start
+                i += count
+                if elapsed >= min_time or count >= 1000000:
+                    break
+                # the first round calibrates the number of operations
+                count = max(count * 2, int(count * min_time / max(elapsed, 1e-9)))
+            per_op = elapsed / count
+            best = per_op if best is None else min(best, per_op)
+        return best, count
+
+def git_commit():
+    try:
+        root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=root, stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r["benchmark"], r["nodes"]): r["seconds_per_op"] for r in json.load(f)["results"]}
+    print()
+    print("{:>18} {:>10} {:>14} {:>14} {:>8}".format("benchmark", "nodes", "us before", "us after", "ratio"))
+    for r in results:
+        before = baseline.get((r["benchmark"], r["nodes"]))
+        if before is None:
+            continue
+        print("{:>18} {:>10} {:>14.2f} {:>14.2f} {:>8.2f}".format(r["benchmark"], r["nodes"], before * 1e6, r["seconds_per_op"] * 1e6, r["seconds_per_op"] / before))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dicta benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="tree sizes in nodes")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="run these benchmarks only")
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="seconds per round")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare the results with this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    print("{:>18} {:>10} {:>14} {:>14}".format("benchmark", "nodes", "us/op", "ops/s"))
+    for name in args.only or BENCHMARKS:
+        for size in args.sizes:
+            per_op, count = measure(BENCHMARKS[name], size, args.rounds, args.min_time)
+            results.append({"benchmark": name, "nodes": size, "seconds_per_op": per_op, "ops_per_round": count})
+            print("{:>18} {:>10} {:>14.2f} {:>14.0f}".format(name, size, per_op * 1e6, 1 / per_op))
+
+    report = {
+        "commit": git_commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "rounds": args.rounds,
+        "min_time": args.min_time,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
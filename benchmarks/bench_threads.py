@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# Measures the throughput of nested writes from several threads with and without
+# Dicta.set_thread_safe(), while reader threads serialize the data.
+#
+# python benchmarks/bench_threads.py
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import dicta
+
+THREADS = [1, 2, 4, 8]
+WRITES = 20000
+READERS = 2
+
+def build(thread_safe):
+    d = dicta.Dicta(records=[{"id": i, "value": 0} for i in range(1000)])
+    d.set_thread_safe(thread_safe)
+    return d
+
+def measure(thread_safe, threads, readers):
+    d = build(thread_safe)
+    records = d["records"]
+    done = threading.Event()
+    reads = [0]
+    def write(n):
+        for i in range(WRITES // threads):
+            records[(i * threads + n) % 1000]["value"] = i
+    def read():
+        while not done.is_set():
+            d.stringify()
+            reads[0] += 1
+    reader_threads = [threading.Thread(target=read) for i in range(readers)]
+    writer_threads = [threading.Thread(target=write, args=(n, )) for n in range(threads)]
+    for thread in reader_threads:
+        thread.start()
+    start = time.perf_counter()
+    for thread in writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+    return WRITES / elapsed, reads[0] / elapsed
+
+if __name__ == "__main__":
+    print("{:>8} {:>8} {:>16} {:>16} {:>16} {:>16}".format("threads", "readers", "writes/s unsafe", "writes/s safe", "reads/s unsafe", "reads/s safe"))
+    for readers in (0, READERS):
+        for threads in THREADS:
+            unsafe = measure(False, threads, readers)
+            safe = measure(True, threads, readers)
+            print("{:>8} {:>8} {:>16.0f} {:>16.0f} {:>16.0f} {:>16.0f}".format(threads, readers, unsafe[0], safe[0], unsafe[1], safe[1]))
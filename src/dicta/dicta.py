@@ -1,65 +1,313 @@
 #!/usr/bin/env python
 
+import io
+import abc
 import os
-import re
+import sys
+import gzip
+import zlib
 import pickle
 import json
+import array
+import struct
+import time
+import atexit
+import asyncio
+import bisect
 import inspect
+import weakref
+import threading
+import contextlib
+import functools
+import collections
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 default_serializer_hook = "<serialized_object>"
 
+# Type tags of tuples and sets in JSON files written with binary serialization (see Dicta.set_serializer()).
+# JSON has no tuples and sets, so they are written as {"<tuple>": [...]} and {"<set>": [...]}.
+tuple_tag = "<tuple>"
+set_tag = "<set>"
+# Typed arrays are written as {"<array>": [typecode, [...]]}, the typecode of array.array or the dtype of a NumPy array
+array_tag = "<array>"
+
+# -------------------------------------------------------------------------------------------------------- Thread Safety
+# Tree-wide lock of a thread safe Dicta (see Dicta.set_thread_safe()). Many threads may read at once
+# (serialization, Dicta.read()), one thread may modify the data. The modifying thread may read and
+# modify again, so callbacks can modify the data. Waiting writers go first, so readers can't starve them.
+class ReadWriteLock():
+    def __init__(self):
+        self.__condition = threading.Condition(threading.Lock())
+        self.__readers = {}
+        self.__writer = None
+        self.__writes = 0
+        self.__waiting_writers = 0
+        # converting a child of a lazy object doesn't modify the data, but must not be done twice at once
+        self.conversion = threading.Lock()
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self.__condition:
+            # a thread that holds the lock already must not wait for waiting writers
+            if self.__writer != me and me not in self.__readers:
+                while self.__writer is not None or self.__waiting_writers:
+                    self.__condition.wait()
+            self.__readers[me] = self.__readers.get(me, 0) + 1
+
+    def release_read(self):
+        me = threading.get_ident()
+        with self.__condition:
+            if self.__readers[me] > 1:
+                self.__readers[me] -= 1
+            else:
+                del self.__readers[me]
+                self.__condition.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self.__condition:
+            if self.__writer == me:
+                self.__writes += 1
+                return
+            if me in self.__readers:
+                raise RuntimeError("Dicta: The data can't be modified while reading it in the same thread.")
+            self.__waiting_writers += 1
+            try:
+                while self.__writer is not None or self.__readers:
+                    self.__condition.wait()
+            finally:
+                self.__waiting_writers -= 1
+            self.__writer = me
+            self.__writes = 1
+
+    def release_write(self):
+        with self.__condition:
+            self.__writes -= 1
+            if not self.__writes:
+                self.__writer = None
+                self.__condition.notify_all()
+
+    @contextlib.contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextlib.contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+# Decorator for the methods that modify the data. The write lock of a thread safe Dicta is held
+# during the modification and its notification, so callbacks and file writes see a consistent state.
+def synchronized(method):
+    @functools.wraps(method)
+    def synchronized_method(self, *args, **kwargs):
+        lock = self.__lock__()
+        if lock is None:
+            return method(self, *args, **kwargs)
+        with lock.write():
+            return method(self, *args, **kwargs)
+    return synchronized_method
+
+# Decorator for the methods that read the whole data (serialization)
+def read_synchronized(method):
+    @functools.wraps(method)
+    def synchronized_method(self, *args, **kwargs):
+        lock = self.__lock__()
+        if lock is None:
+            return method(self, *args, **kwargs)
+        with lock.read():
+            return method(self, *args, **kwargs)
+    return synchronized_method
+
+
 # -------------------------------------------------------------------------------------------------------- Shared Capabilities
 # The callback method for nested objects. 
-# Calls the callback method of its parent -> the callback bubbles up the tree
+# Calls the callback method of its parent -> the callback bubbles up the tree.
+# Every node counts its modifications (including the modifications of its childs)
+# in 'version', so a change is detected in O(depth) without serializing the tree.
+# Every node knows its 'key' (dict key or list/tuple index) in its parent, so its
+# path from Dicta is known without searching the tree.
+# Every node caches its encoded JSON 'fragment' and its 'snapshot' (see Dicta.snapshot()) together with 
+# the version they were taken at. A modification changes the version of the node and its parents, which 
+# invalidates their fragments and snapshots.
+# Nodes store their state in '__slots__' (see node_slots) instead of an instance dict, as large trees
+# hold millions of them. The parent is the only reference to the tree, its callback is looked up on demand.
 class ParentCaller():
-    def __init__(self, parent, call_to_parent):
+    __slots__ = ()
+
+    def __init__(self, parent, key=None):
         self.parent = parent
-        self.call_to_parent = call_to_parent
+        self.key = key
+        self.version = 0
+        self.fragment = None
+        self.snapshot = None
 
     def __call_from_child__(self, object_after_modification, modify_info, data_tree):
+        self.version += 1
         data_tree.insert(0, self)
-        self.parent.__call_from_child__(object_after_modification=object_after_modification, modify_info=modify_info, data_tree=[self])
+        if self.parent is not None:
+            self.parent.__call_from_child__(object_after_modification=object_after_modification, modify_info=modify_info, data_tree=data_tree)
+
+    # Count the own modification and bubble it up the tree
+    def __modified__(self, modify_info):
+        self.version += 1
+        if self.parent is not None:
+            self.parent.__call_from_child__(object_after_modification=self, modify_info=modify_info, data_tree=[self])
+
+    # JSON Pointer (RFC 6901) from Dicta to this object
+    def __pointer__(self):
+        tokens = []
+        node = self
+        while isinstance(node, ParentCaller):
+            tokens.append("/" + str(node.key).replace("~", "~0").replace("/", "~1"))
+            node = node.parent
+        tokens.reverse()
+        return "".join(tokens)
+
+    # The lock of a thread safe Dicta or None
+    def __lock__(self):
+        node = self
+        while isinstance(node, ParentCaller):
+            node = node.parent
+        return getattr(node, "lock", None)
+
+    def __attach__(self, parent):
+        self.parent = parent
+
+    # Detached objects (removed or replaced childs) don't call their former parent anymore
+    def __detach__(self):
+        self.parent = None
 
 # Method to convert childs to NestedDict, NestedList or NestedTuple Class, 
-# giving them the ability to convert nested objects and to call its parrent on data change
+# giving them the ability to convert nested objects and to call its parrent on data change.
+# The new object is filled silently: a conversion is part of the modification of its parent
+# and must not throw events on its own.
 class ChildConverter():
-    def __convert_child__(self, child):
+    __slots__ = ()
+
+    def __convert_child__(self, child, key=None, lazy=None):
+        if lazy is None:
+            lazy = self.__lazy__()
+        if lazy and (isinstance(child, dict) or isinstance(child, list)):
+            return self.__convert_child_lazily__(child, key)
         if isinstance(child, dict):
-            # iter throu childs and convert them if they are a dict, a list, a tuble or a set
-            for key, value in child.items():
-                if isinstance(value, dict) or isinstance(value, list) or isinstance(value, tuple)  or isinstance(value, set):
-                    child[key] = self.__convert_child__(value)
-            # subclass the dict
-            nestedDict = NestedDict(parent=self, call_to_parent=self.__call_from_child__)
-            nestedDict.update(child)
+            nestedDict = NestedDict(parent=self, key=key)
+            for k, value in child.items():
+                dict.__setitem__(nestedDict, k, nestedDict.__convert_child__(value, k, lazy))
             return nestedDict
         elif isinstance(child, list):
-            # iter throu childs and convert them if they are a dict, a list, a tuble or a set
-            for i in range(len(child)):
-                if isinstance(child[i], dict) or isinstance(child[i], list) or isinstance(child[i], tuple)  or isinstance(child[i], set):
-                    child[i] = self.__convert_child__(child[i])
-            # subclass the list
-            nestedList = NestedList(parent=self, call_to_parent=self.__call_from_child__)
-            nestedList.extend(child)
+            nestedList = NestedList(parent=self, key=key)
+            list.extend(nestedList, [nestedList.__convert_child__(item, i, lazy) for i, item in enumerate(child)])
             return nestedList
         elif isinstance(child, tuple):
-            # iter throu childs and convert them if they are a dict, a list, a tuble or a set
-            for i in range(len(child)):
-                if isinstance(child[i], dict) or isinstance(child[i], list) or isinstance(child[i], tuple)  or isinstance(child[i], set):
-                    child[i] = self.__convert_child__(child[i])
-            # subclass the tuple
-            nestedTuple = NestedTuple(parent=self, call_to_parent=self.__call_from_child__, iterable=child)
+            # a tuple can't be filled after its creation, so its childs are converted first and attached afterwards
+            items = [self.__convert_child__(item, i, lazy) for i, item in enumerate(child)]
+            nestedTuple = NestedTuple(parent=self, iterable=items, key=key)
+            for item in items:
+                if isinstance(item, ParentCaller):
+                    item.__attach__(nestedTuple)
             return nestedTuple
         elif isinstance(child, set):
             # no need to iter throu the child items of the set, as they are not changable
-            # subclass the set
-            nestedSet = NestedSet(parent=self, call_to_parent=self.__call_from_child__, iterable=child)
-            return nestedSet
+            return NestedSet(parent=self, iterable=child, key=key)
+        elif isinstance(child, array.array):
+            return NestedArray(parent=self, typecode=child.typecode, initializer=child, key=key)
+        elif numpy is not None and isinstance(child, numpy.ndarray) and child.dtype.kind in numeric_kinds:
+            return NestedNdarray(parent=self, data=child, key=key)
         else:
             return child
 
+    # Lazy mode: plain dicts and lists are stored as they are and are only converted when they are 
+    # accessed. Nested objects of another parent can't be shared and are converted right away.
+    def __convert_child_lazily__(self, child, key):
+        if isinstance(child, dict):
+            nestedDict = LazyNestedDict(parent=self, key=key)
+            for k, value in dict.items(child):
+                if isinstance(value, ParentCaller) or isinstance(value, array_types):
+                    value = nestedDict.__convert_child__(value, k, True)
+                dict.__setitem__(nestedDict, k, value)
+            return nestedDict
+        else:
+            nestedList = LazyNestedList(parent=self, key=key)
+            list.extend(nestedList, [nestedList.__convert_child__(item, i, True) if isinstance(item, ParentCaller) or isinstance(item, array_types) else item for i, item in enumerate(list.__iter__(child))])
+            return nestedList
+
+    # Convert a plain child of a lazy object on its first access. The data doesn't change, so no event is thrown.
+    def __wrap_child__(self, key, child):
+        if type(child) in plain_types:
+            lock = self.__lock__()
+            if lock is None:
+                return self.__store_wrapped_child__(key, child)
+            with lock.conversion:
+                # another thread may have converted the child meanwhile
+                child = dict.__getitem__(self, key) if isinstance(self, dict) else list.__getitem__(self, key)
+                if type(child) in plain_types:
+                    child = self.__store_wrapped_child__(key, child)
+        return child
+
+    def __store_wrapped_child__(self, key, child):
+        child = self.__convert_child__(child, key, True)
+        if isinstance(self, dict):
+            dict.__setitem__(self, key, child)
+        else:
+            list.__setitem__(self, key, child)
+        return child
+
+    def __lazy__(self):
+        node = self
+        while isinstance(node, ParentCaller):
+            node = node.parent
+        return getattr(node, "lazy", False)
+
+    # An in-place operator (d["list"] += items) assigns the modified child to its own key again.
+    # The child notified its modification already, so the assignment is no modification.
+    def __is_child__(self, key, value):
+        if not isinstance(value, ParentCaller) or value.parent is not self:
+            return False
+        try:
+            return (dict.__getitem__(self, key) if isinstance(self, dict) else list.__getitem__(self, key)) is value
+        except (KeyError, IndexError, TypeError):
+            return False
+
+    def __detach_child__(self, child):
+        if isinstance(child, ParentCaller):
+            child.__detach__()
+
+    def __detach_childs__(self, childs):
+        for child in childs:
+            if isinstance(child, ParentCaller):
+                child.__detach__()
+
 # Custom update function for dicts
 class DictUpdater():
+    __slots__ = ()
+
     def update(self, *args, **kwargs):
         '''Update dict'''
         if args:
@@ -72,535 +320,3249 @@ class DictUpdater():
         for key in kwargs:
             self[key] = kwargs[key]
 
-# Custom json encoder to encode non-serializable objects to binary strings
+# Compact record of a modification. Instead of copying the whole object before every
+# modification, the modified object stores what is needed to restore its previous state:
+# the old value at a key/index, a removed slice, the items added to a set...
+# The previous state is only restored on demand, by applying the record to a copy of the
+# object as it was right after the modification.
+class UndoRecord():
+    __slots__ = ("action", "key", "value")
+
+    def __init__(self, action, key=None, value=None):
+        self.action = action
+        self.key = key
+        self.value = value
+
+    def __repr__(self):
+        return "UndoRecord({!r}, key={!r}, value={!r})".format(self.action, self.key, self.value)
+
+    def restore(self, obj):
+        '''Apply the record to 'obj' (a plain copy of the modified object) and return it'''
+        if self.action == "set":
+            obj[self.key] = self.value
+        elif self.action == "delete":
+            del obj[self.key]
+        elif self.action == "insert":
+            obj[self.key:self.key] = self.value
+        elif self.action == "add":
+            obj.update(self.value)
+        elif self.action == "discard":
+            obj.difference_update(self.value)
+        elif self.action == "merge":
+            # 'key' lists the added keys, 'value' holds the replaced values
+            for key in self.key:
+                del obj[key]
+            obj.update(self.value)
+        elif self.action == "reverse":
+            obj.reverse()
+        elif self.action == "restore":
+            if isinstance(obj, array_types):
+                obj[:] = self.value
+                return obj
+            obj.clear()
+            if isinstance(obj, list):
+                obj.extend(self.value)
+            else:
+                obj.update(self.value)
+        return obj
+
+# The states of the modified objects before the events of a callback, restored from the undo records
+# when an event is read (see Event). Each object has one working copy, which is rolled back from the
+# latest event to the earliest, so every record is applied to the state its object had right after
+# the modification. Reading an earlier event after a later one of the same object starts again from
+# the object. The objects must not be modified in the meantime.
+class BeforeStates():
+    def __init__(self, events):
+        self.objects = [event["object_after_modification"] for event in events]
+        self.undos = [event.get("undo") for event in events]
+        self.positions = {}
+        self.versions = {}
+        for position, obj in enumerate(self.objects):
+            self.positions.setdefault(id(obj), []).append(position)
+            self.versions[id(obj)] = obj.version
+        # id of the object: [working copy, index in positions of the earliest record applied]
+        self.copies = {}
+
+    def restore(self, obj, position):
+        '''Returns a copy of 'obj' as it was before the event at 'position' (or before the first later event of 'obj')'''
+        if id(obj) in self.versions and obj.version != self.versions[id(obj)]:
+            raise ValueError("Dicta: The object was modified after the event, its state before the modification can't be restored anymore. Read 'object_before_modification' in the callback.")
+        positions = self.positions.get(id(obj), ())
+        first = bisect.bisect_left(positions, position)
+        if first == len(positions):
+            return copy_array(obj) if isinstance(obj, array_types) else obj.copy()
+        if id(obj) not in self.copies or self.copies[id(obj)][1] < first:
+            self.copies[id(obj)] = [copy_array(obj) if isinstance(obj, array_types) else obj.copy(), len(positions)]
+        working = self.copies[id(obj)]
+        for index in range(working[1] - 1, first - 1, -1):
+            if self.undos[positions[index]] is not None:
+                self.undos[positions[index]].restore(working[0])
+        working[1] = first
+        return copy_array(working[0]) if isinstance(working[0], array_types) else working[0].copy()
+
+# Event that restores 'object_before_modification' when it is read. It is not listed by keys(),
+# items() or repr() before.
+class Event(dict):
+    __slots__ = ("states", "position")
+
+    def __init__(self, modify_info, states, position):
+        super(Event, self).__init__(modify_info)
+        self.states = states
+        self.position = position
+
+    def __missing__(self, key):
+        if key != "object_before_modification":
+            raise KeyError(key)
+        state = self.states.restore(dict.__getitem__(self, "object_after_modification"), self.position)
+        self[key] = state
+        return state
+
+    def __contains__(self, key):
+        return key == "object_before_modification" or super(Event, self).__contains__(key)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def restore(self):
+        '''Restore 'object_before_modification' right away'''
+        return self["object_before_modification"]
+
+# Instance attributes of the nested objects (see ParentCaller)
+node_slots = ("parent", "key", "version", "fragment", "snapshot")
+
+# Types that are encoded to JSON as they are. Objects of other types (besides the nested objects)
+# may be modified without Dicta noticing, so their encoded fragments are never cached.
+json_types = (str, int, float, bool, type(None))
+
+# Containers that are stored unconverted by lazy objects until they are accessed
+plain_types = (dict, list, tuple, set)
+
+# Typed numeric arrays (see NestedArray, NestedNdarray). NumPy is optional, only NumPy arrays of
+# booleans, integers and floats (dtype kinds) are typed arrays of Dicta.
+array_types = (array.array, numpy.ndarray) if numpy is not None else (array.array, )
+numeric_kinds = "biuf"
+
+# Returns the typed array of a typecode (array.array) or dtype (NumPy)
+def make_array(typecode, items):
+    if len(typecode) == 1:
+        return array.array(typecode, items)
+    if numpy is None:
+        raise ValueError("Dicta: The data contains a NumPy array of dtype '{}'. Install NumPy to load it.".format(typecode))
+    return numpy.array(items, dtype=typecode)
+
+def copy_array(obj):
+    if isinstance(obj, array.array):
+        return array.array(obj.typecode, obj)
+    return numpy.array(obj)
+
+def tag_array(obj):
+    if isinstance(obj, array.array):
+        return {array_tag: [obj.typecode, obj.tolist()]}
+    return {array_tag: [obj.dtype.str, obj.tolist()]}
+
+# Default of the JSON encoders: typed arrays are encoded as lists, NumPy numbers as Python numbers
+def encode_array(obj):
+    if isinstance(obj, array_types):
+        return obj.tolist()
+    if numpy is not None and isinstance(obj, numpy.generic):
+        return obj.item()
+    raise TypeError("Object of type {} is not JSON serializable".format(type(obj).__name__))
+
+# Replace the tuples in plain data by tagged objects (see tuple_tag). Containers without tuples are returned as they are.
+def tag_tuples(obj):
+    if isinstance(obj, tuple):
+        return {tuple_tag: [tag_tuples(item) for item in obj]}
+    elif isinstance(obj, dict):
+        tagged = None
+        for key, value in dict.items(obj):
+            if type(value) not in json_types:
+                new = tag_tuples(value)
+                if new is not value:
+                    if tagged is None:
+                        tagged = dict(dict.items(obj))
+                    tagged[key] = new
+        return obj if tagged is None else tagged
+    elif isinstance(obj, list):
+        tagged = None
+        for i, value in enumerate(list.__iter__(obj)):
+            if type(value) not in json_types:
+                new = tag_tuples(value)
+                if new is not value:
+                    if tagged is None:
+                        tagged = list(list.__iter__(obj))
+                    tagged[i] = new
+        return obj if tagged is None else tagged
+    return obj
+
+# Custom json encoder to encode non-serializable objects to binary strings. Tuples and sets are tagged.
 class Serializer(json.JSONEncoder):
     def __init__(self, serializer_hook, **kwargs):
         super(Serializer, self).__init__(**kwargs)
         self.serializer_hook = serializer_hook
+
+    def encode(self, obj):
+        # the C encoder writes tuples as lists without calling default()
+        return super(Serializer, self).encode(tag_tuples(obj))
     
     def default(self, obj):
+        if isinstance(obj, set):
+            return {set_tag: [tag_tuples(item) for item in obj]}
+        if isinstance(obj, array_types):
+            return tag_array(obj)
         try:
             return {self.serializer_hook: pickle.dumps(obj).decode('latin-1')}
         except pickle.PickleError:
             return super().default(obj)
 
+# Custom json encoder for Dicta.stringify(): non-serializable objects are replaced by the serializer hook.
+# They are not pickled at all, as the binaries would be thrown away anyway. Sets and typed arrays are
+# serializable, their items are written as lists like the items of tuples.
+class RedactingSerializer(json.JSONEncoder):
+    def __init__(self, serializer_hook, **kwargs):
+        super(RedactingSerializer, self).__init__(**kwargs)
+        self.serializer_hook = serializer_hook
+
+    def default(self, obj):
+        if isinstance(obj, set):
+            return list(obj)
+        if isinstance(obj, array_types):
+            return obj.tolist()
+        return self.serializer_hook
+
+
+# -------------------------------------------------------------------------------------------------------- Serializer Backends
+# File formats of Dicta (see Dicta.set_backend()). A backend encodes the data of Dicta to a string
+# or bytes and decodes the content of a file back to plain data. The format of a file is detected
+# when it is read, so files of every format can be pulled. A backend implements encode() and decode().
+class SerializerBackend(abc.ABC):
+    name = None
+    # the encoded data is bytes that are not text
+    binary = False
+
+    @abc.abstractmethod
+    def encode(self, dicta, redact=False):
+        '''Encode the data of 'dicta'. Non-serializable objects are replaced by the serializer hook if 'redact' is True'''
+
+    @abc.abstractmethod
+    def decode(self, data, dicta):
+        '''Decode 'data' (bytes) to plain data'''
+
+    def iterencode(self, dicta, redact=False):
+        '''Encode the data of 'dicta' in chunks (strings or bytes). Backends that can't encode incrementally yield a single chunk'''
+        yield self.encode(dicta, redact)
+
+    def detect(self, data):
+        '''Returns True if 'data' (the beginning of a file) is encoded in the format of the backend'''
+        return not data.startswith(BinaryBackend.magic)
+
+
+# Standard library json. Unmodified nested objects are not encoded again (see Dicta.__encode__()).
+class JSONBackend(SerializerBackend):
+    name = "json"
+
+    def encode(self, dicta, redact=False):
+        return dicta.__serialize__(redact)
+
+    def iterencode(self, dicta, redact=False):
+        return dicta.__stream__(redact)
+
+    def decode(self, data, dicta):
+        if dicta.binary_serializer:
+            return json.loads(data, object_hook=dicta.__deserialize__)
+        return json.loads(data)
+
+
+# orjson (optional, pip install orjson). The files are compact JSON without whitespace.
+class OrjsonBackend(SerializerBackend):
+    name = "orjson"
+
+    def encode(self, dicta, redact=False):
+        # orjson encodes dict and list subclasses natively, but not tuple subclasses
+        def default(obj):
+            tagged = dicta.binary_serializer and not redact
+            if isinstance(obj, tuple):
+                return {tuple_tag: list(obj)} if tagged else list(obj)
+            if isinstance(obj, array_types):
+                return tag_array(obj) if tagged else obj.tolist()
+            if isinstance(obj, set) and dicta.binary_serializer:
+                return {set_tag: [tag_tuples(item) for item in obj]} if tagged else list(obj)
+            if redact:
+                return dicta.serializer_hook
+            if dicta.binary_serializer:
+                return {dicta.serializer_hook: pickle.dumps(obj).decode('latin-1')}
+            raise TypeError("Object of type {} is not JSON serializable".format(type(obj).__name__))
+        try:
+            return orjson.dumps(dicta, default=default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson doesn't support integers beyond 64 bits, json does (or raises the same error)
+            return dicta.__serialize__(redact)
+
+    def decode(self, data, dicta):
+        data = orjson.loads(data)
+        if dicta.binary_serializer:
+            return dicta.__deserialize_data__(data)
+        return data
+
+
+# Length-prefixed binary format. Every value starts with a one byte type tag. Strings, bytes,
+# containers and pickled objects are prefixed with their length (or item count), so they are read
+# without scanning or unescaping. Tuples, sets, bytes, typed arrays and non-string dict keys are stored natively.
+class BinaryBackend(SerializerBackend):
+    name = "binary"
+    binary = True
+    magic = b"DICTA\x00\x01"
+
+    __int = struct.Struct("<q")
+    __float = struct.Struct("<d")
+    __size = struct.Struct("<I")
+
+    def detect(self, data):
+        return data.startswith(self.magic)
+
+    def encode(self, dicta, redact=False):
+        parts = [self.magic]
+        self.__encode_value(dicta, parts.append, dicta, redact)
+        return b"".join(parts)
+
+    def __encode_value(self, obj, append, dicta, redact):
+        size = self.__size.pack
+        if obj is None:
+            append(b"N")
+        elif obj is True:
+            append(b"T")
+        elif obj is False:
+            append(b"F")
+        elif isinstance(obj, str):
+            data = obj.encode("utf-8", "surrogatepass")
+            append(b"s" + size(len(data)) + data)
+        elif isinstance(obj, int):
+            if -0x8000000000000000 <= obj <= 0x7fffffffffffffff:
+                append(b"i" + self.__int.pack(obj))
+            else:
+                data = str(obj).encode()
+                append(b"I" + size(len(data)) + data)
+        elif isinstance(obj, float):
+            append(b"f" + self.__float.pack(obj))
+        elif isinstance(obj, dict):
+            # the base class methods don't convert the childs of lazy objects
+            append(b"d" + size(len(obj)))
+            for key, value in dict.items(obj):
+                self.__encode_value(key, append, dicta, redact)
+                self.__encode_value(value, append, dicta, redact)
+        elif isinstance(obj, (list, tuple, set)):
+            if isinstance(obj, list):
+                append(b"l" + size(len(obj)))
+                obj = list.__iter__(obj)
+            else:
+                append((b"t" if isinstance(obj, tuple) else b"e") + size(len(obj)))
+            for value in obj:
+                self.__encode_value(value, append, dicta, redact)
+        elif isinstance(obj, bytes):
+            append(b"b" + size(len(obj)) + obj)
+        elif isinstance(obj, array.array):
+            # the buffer is written as it is, in little-endian byte order
+            if sys.byteorder != "little":
+                obj = array.array(obj.typecode, obj)
+                obj.byteswap()
+            data = obj.tobytes()
+            append(b"a" + obj.typecode.encode() + size(len(data)) + data)
+        elif numpy is not None and isinstance(obj, numpy.ndarray) and obj.dtype.kind in numeric_kinds:
+            # the dtype holds the byte order of the buffer
+            dtype = obj.dtype.str.encode()
+            data = numpy.ascontiguousarray(obj).tobytes()
+            append(b"n" + size(len(dtype)) + dtype + size(obj.ndim) + b"".join([size(n) for n in obj.shape]) + size(len(data)) + data)
+        elif redact:
+            self.__encode_value(dicta.serializer_hook, append, dicta, redact)
+        elif dicta.binary_serializer:
+            data = pickle.dumps(obj)
+            append(b"p" + size(len(data)) + data)
+        else:
+            raise TypeError("Object of type {} is not serializable. Activate binary serialization with Dicta.set_serializer(True).".format(type(obj).__name__))
+
+    def decode(self, data, dicta):
+        if not data.startswith(self.magic):
+            raise ValueError("Data is not encoded in the binary format of Dicta.")
+        return self.__decode_value(data, len(self.magic), dicta.binary_serializer)[0]
+
+    # Returns the value at 'pos' and the position after it
+    def __decode_value(self, data, pos, unpickle):
+        tag = chr(data[pos])
+        pos += 1
+        if tag in "sbIp":
+            length = self.__size.unpack_from(data, pos)[0]
+            pos += 4
+            value = data[pos:pos + length]
+            pos += length
+            if tag == "s":
+                return value.decode("utf-8", "surrogatepass"), pos
+            elif tag == "I":
+                return int(value), pos
+            elif tag == "p":
+                if not unpickle:
+                    raise ValueError("Data contains serialized objects. Activate binary serialization with Dicta.set_serializer(True) to load them.")
+                return pickle.loads(value), pos
+            return value, pos
+        elif tag == "i":
+            return self.__int.unpack_from(data, pos)[0], pos + 8
+        elif tag == "f":
+            return self.__float.unpack_from(data, pos)[0], pos + 8
+        elif tag == "d":
+            count = self.__size.unpack_from(data, pos)[0]
+            pos += 4
+            obj = {}
+            for i in range(count):
+                key, pos = self.__decode_value(data, pos, unpickle)
+                obj[key], pos = self.__decode_value(data, pos, unpickle)
+            return obj, pos
+        elif tag == "a":
+            typecode = chr(data[pos])
+            length = self.__size.unpack_from(data, pos + 1)[0]
+            pos += 5
+            obj = array.array(typecode)
+            obj.frombytes(data[pos:pos + length])
+            if sys.byteorder != "little":
+                obj.byteswap()
+            return obj, pos + length
+        elif tag == "n":
+            if numpy is None:
+                raise ValueError("Data contains a NumPy array. Install NumPy to load it.")
+            length = self.__size.unpack_from(data, pos)[0]
+            dtype = data[pos + 4:pos + 4 + length].decode()
+            pos += 4 + length
+            ndim = self.__size.unpack_from(data, pos)[0]
+            shape = [self.__size.unpack_from(data, pos + 4 + 4 * i)[0] for i in range(ndim)]
+            pos += 4 + 4 * ndim
+            length = self.__size.unpack_from(data, pos)[0]
+            pos += 4
+            return numpy.frombuffer(data[pos:pos + length], dtype=dtype).reshape(shape).copy(), pos + length
+        elif tag in "lte":
+            count = self.__size.unpack_from(data, pos)[0]
+            pos += 4
+            items = []
+            for i in range(count):
+                value, pos = self.__decode_value(data, pos, unpickle)
+                items.append(value)
+            if tag == "t":
+                return tuple(items), pos
+            elif tag == "e":
+                return set(items), pos
+            return items, pos
+        elif tag == "N":
+            return None, pos
+        elif tag == "T":
+            return True, pos
+        elif tag == "F":
+            return False, pos
+        raise ValueError("Invalid type tag {!r} at position {}.".format(tag, pos - 1))
+
+
+backends = {
+    "json": JSONBackend(),
+    "orjson": OrjsonBackend(),
+    "binary": BinaryBackend(),
+}
+
+
+# -------------------------------------------------------------------------------------------------------- Compression
+# Compressed files (see Dicta.set_compression()). A compression wraps an open binary file, so data is
+# compressed while it is written and decompressed while it is read. The compression of a file is 
+# detected by its first bytes when it is read, so compressed and uncompressed files can be pulled.
+# A compression implements wrap().
+class Compression(abc.ABC):
+    name = None
+    # file extensions that select the compression in "auto" mode
+    extensions = ()
+    magic = None
+    default_level = None
+
+    @abc.abstractmethod
+    def wrap(self, fileobj, mode, level=None):
+        '''Returns a file object that compresses ('wb') or decompresses ('rb') 'fileobj'. 'fileobj' is not closed with it'''
+
+    def detect(self, data):
+        '''Returns True if 'data' (the beginning of a file) is compressed by the compression'''
+        return data.startswith(self.magic)
+
+
+class GzipCompression(Compression):
+    name = "gzip"
+    extensions = (".gz", ".gzip")
+    magic = b"\x1f\x8b"
+    default_level = 6
+
+    def wrap(self, fileobj, mode, level=None):
+        return gzip.GzipFile(filename="", mode=mode, fileobj=fileobj, compresslevel=self.default_level if level is None else level)
+
+
+# xz container of the standard library lzma module (optional, some Python builds don't include it)
+class LzmaCompression(Compression):
+    name = "lzma"
+    extensions = (".xz", ".lzma")
+    magic = b"\xfd7zXZ\x00"
+    default_level = 6
+
+    def wrap(self, fileobj, mode, level=None):
+        if mode == "wb":
+            return lzma.LZMAFile(fileobj, mode, preset=self.default_level if level is None else level)
+        return lzma.LZMAFile(fileobj, mode)
+
+
+# Raw zlib stream. A zlib stream starts with 0x78 at the default window size, which no JSON file 
+# or binary file of Dicta starts with.
+class ZlibCompression(Compression):
+    name = "zlib"
+    extensions = (".zz", ".zlib")
+    magic = b"\x78"
+    default_level = 6
+
+    def wrap(self, fileobj, mode, level=None):
+        if mode == "wb":
+            return ZlibFile(fileobj, mode, self.default_level if level is None else level)
+        return io.BufferedReader(ZlibFile(fileobj, mode))
+
+
+# File object of a zlib stream, like gzip.GzipFile for gzip files
+class ZlibFile(io.RawIOBase):
+    read_size = 65536
+
+    def __init__(self, fileobj, mode, level=-1):
+        self.fileobj = fileobj
+        self.mode = mode
+        if mode == "wb":
+            self.compressor = zlib.compressobj(level)
+        else:
+            self.decompressor = zlib.decompressobj()
+
+    def readable(self):
+        return self.mode == "rb"
+
+    def writable(self):
+        return self.mode == "wb"
+
+    def readinto(self, buffer):
+        decompressor = self.decompressor
+        while not decompressor.eof:
+            data = decompressor.unconsumed_tail or self.fileobj.read(self.read_size)
+            if not data:
+                raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+            chunk = decompressor.decompress(data, len(buffer))
+            if chunk:
+                buffer[:len(chunk)] = chunk
+                return len(chunk)
+        return 0
+
+    def write(self, data):
+        self.fileobj.write(self.compressor.compress(data))
+        return len(data)
+
+    def close(self):
+        if not self.closed and self.mode == "wb":
+            self.fileobj.write(self.compressor.flush())
+        super(ZlibFile, self).close()
+
+
+compressions = {
+    "gzip": GzipCompression(),
+    "lzma": LzmaCompression(),
+    "zlib": ZlibCompression(),
+}
+
 
 # -------------------------------------------------------------------------------------------------------- Nested Set Class
 class NestedSet(set, ParentCaller):
-    def __init__(self, parent, call_to_parent, iterable):
-        object_before_modification = self.copy()
-        ParentCaller.__init__(self, parent, call_to_parent)
-        r = super(NestedSet, self).__init__(iterable)
-        modify_info = {
-            "type": type(self),
-            "mode": "new",
-            "iterable": iterable,
-            "object_before_modification": object_before_modification,
-            "object_after_modification": self
-        }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
-        return r
-    
+    __slots__ = node_slots
+
+    def __init__(self, parent, iterable, key=None):
+        ParentCaller.__init__(self, parent, key)
+        super(NestedSet, self).__init__(iterable)
+
     def __repr__(self):
         return str(set(self))
-    
+
+    def __reduce__(self):
+        # unpickled (and copied) sets are plain sets
+        return (set, (set(set.__iter__(self)), ))
+
+    @synchronized
     def add(self, item):
-        object_before_modification = self.copy()
+        undo = None if item in self else UndoRecord("discard", value=[item])
         super(NestedSet, self).add(item)
         modify_info = {
             "type": type(self),
             "mode": "add",
             "item": item,
-            "object_before_modification": object_before_modification,
+            "undo": undo,
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
-        
+        self.__modified__(modify_info)
+
+    @synchronized
     def update(self, iterable):
-        object_before_modification = self.copy()
-        super(NestedSet, self).update(iterable)
+        items = list(iterable)
+        undo = UndoRecord("discard", value=[item for item in set(items) if item not in self])
+        super(NestedSet, self).update(items)
         modify_info = {
             "type": type(self),
             "mode": "update",
             "item": iterable,
-            "object_before_modification": object_before_modification,
+            "undo": undo,
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
-        
+        self.__modified__(modify_info)
+
+    @synchronized
+    def difference_update(self, *iterables):
+        removed = [item for iterable in iterables for item in iterable if item in self]
+        super(NestedSet, self).difference_update(removed)
+        modify_info = {
+            "type": type(self),
+            "mode": "difference_update",
+            "item": iterables,
+            "undo": UndoRecord("add", value=removed),
+            "object_after_modification": self
+        }
+        self.__modified__(modify_info)
+
+    @synchronized
+    def intersection_update(self, *iterables):
+        others = [set(iterable) for iterable in iterables]
+        removed = [item for item in self if not all(item in other for other in others)]
+        super(NestedSet, self).difference_update(removed)
+        modify_info = {
+            "type": type(self),
+            "mode": "intersection_update",
+            "item": iterables,
+            "undo": UndoRecord("add", value=removed),
+            "object_after_modification": self
+        }
+        self.__modified__(modify_info)
+
+    @synchronized
+    def symmetric_difference_update(self, iterable):
+        # items are added and removed, so the whole set is restored
+        undo = UndoRecord("restore", value=set(self))
+        super(NestedSet, self).symmetric_difference_update(iterable)
+        modify_info = {
+            "type": type(self),
+            "mode": "symmetric_difference_update",
+            "item": iterable,
+            "undo": undo,
+            "object_after_modification": self
+        }
+        self.__modified__(modify_info)
+
+    # In-place operators modify the set with a single event. Like for set, the operand must be a set.
+    def __ior__(self, other):
+        if not isinstance(other, (set, frozenset)):
+            return NotImplemented
+        self.update(other)
+        return self
+
+    def __iand__(self, other):
+        if not isinstance(other, (set, frozenset)):
+            return NotImplemented
+        self.intersection_update(other)
+        return self
+
+    def __isub__(self, other):
+        if not isinstance(other, (set, frozenset)):
+            return NotImplemented
+        self.difference_update(other)
+        return self
+
+    def __ixor__(self, other):
+        if not isinstance(other, (set, frozenset)):
+            return NotImplemented
+        self.symmetric_difference_update(other)
+        return self
+
+    @synchronized
     def pop(self):
-        object_before_modification = self.copy()
         r = super(NestedSet, self).pop()
         modify_info = {
             "type": type(self),
             "mode": "pop",
-            "object_before_modification": object_before_modification,
+            "undo": UndoRecord("add", value=[r]),
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
+        self.__modified__(modify_info)
         return r
-        
+
+    @synchronized
     def remove(self, item):
-        object_before_modification = self.copy()
         super(NestedSet, self).remove(item)
         modify_info = {
             "type": type(self),
             "mode": "remove",
             "value": item,
-            "object_before_modification": object_before_modification,
+            "undo": UndoRecord("add", value=[item]),
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
-        
+        self.__modified__(modify_info)
+
+    @synchronized
     def discard(self, item):
-        object_before_modification = self.copy()
+        undo = UndoRecord("add", value=[item]) if item in self else None
         super(NestedSet, self).discard(item)
         modify_info = {
             "type": type(self),
             "mode": "remove",
             "value": item,
-            "object_before_modification": object_before_modification,
+            "undo": undo,
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
-        
+        self.__modified__(modify_info)
+
+    @synchronized
     def clear(self):
-        object_before_modification = self.copy()
+        undo = UndoRecord("restore", value=set(self))
         super(NestedSet, self).clear()
         modify_info = {
             "type": type(self),
             "mode": "clear",
-            "object_before_modification": object_before_modification,
+            "undo": undo,
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
+        self.__modified__(modify_info)
 
 
 # -------------------------------------------------------------------------------------------------------- Nested Tuple Class
+# Python doesn't support non-empty __slots__ for tuple subclasses, so tuples keep an instance dict
 class NestedTuple(tuple, ChildConverter, ParentCaller):
-    def __init__(self, parent, call_to_parent, iterable):
-        ParentCaller.__init__(self, parent, call_to_parent)
-        
-    def __new__ (self, parent, call_to_parent, iterable):
-        ParentCaller.__init__(self, parent, call_to_parent)
-        r = super(NestedTuple, self).__new__(self, iterable)
-        modify_info = {
-            "type": type(self),
-            "mode": "new",
-            "iterable": iterable,
-            "object_before_modification": None,
-            "object_after_modification": self
-        }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
-        return r
+    def __init__(self, parent, iterable, key=None):
+        ParentCaller.__init__(self, parent, key)
+
+    def __new__ (cls, parent, iterable, key=None):
+        return super(NestedTuple, cls).__new__(cls, iterable)
+
+    def __reduce__(self):
+        # unpickled (and copied) tuples are plain tuples
+        return (tuple, (tuple(tuple.__iter__(self)), ))
 
 
 # -------------------------------------------------------------------------------------------------------- Nested Dict Class
 class NestedDict(dict, ChildConverter, ParentCaller, DictUpdater):
-    def __init__(self, parent, call_to_parent):
-        ParentCaller.__init__(self, parent, call_to_parent)
+    __slots__ = node_slots
+
+    def __init__(self, parent, key=None):
+        ParentCaller.__init__(self, parent, key)
 
+    def __reduce__(self):
+        # unpickled (and copied) dicts are plain dicts, the base class methods don't wrap the childs of lazy dicts
+        return (dict, (dict(dict.items(self)), ))
+
+    @synchronized
     def __setitem__(self, key, val):
-        object_before_modification = self.copy()
-        super(NestedDict, self).__setitem__(key, self.__convert_child__(val))
+        if self.__is_child__(key, val):
+            return
+        child = self.__convert_child__(val, key)
+        if key in self:
+            old = dict.__getitem__(self, key)
+            undo = UndoRecord("set", key, old)
+            self.__detach_child__(old)
+        else:
+            undo = UndoRecord("delete", key)
+        super(NestedDict, self).__setitem__(key, child)
         modify_info = {
             "type": type(self),
             "mode": "setitem",
             "key": key,
             "value": val,
-            "object_before_modification": object_before_modification,
+            "undo": undo,
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
+        self.__modified__(modify_info)
 
+    @synchronized
     def __delitem__(self, key):
-        object_before_modification = self.copy()
+        old = dict.__getitem__(self, key)
         super(NestedDict, self).__delitem__(key)
+        self.__detach_child__(old)
         modify_info = {
             "type": type(self),
             "mode": "delitem",
             "key": key,
-            "object_before_modification": object_before_modification,
+            "undo": UndoRecord("set", key, old),
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
+        self.__modified__(modify_info)
 
+    @synchronized
     def clear(self):
-        object_before_modification = self.copy()
+        undo = UndoRecord("restore", value=dict(self))
+        self.__detach_childs__(self.values())
         super(NestedDict, self).clear()
         modify_info = {
             "type": type(self),
             "mode": "clear",
-            "object_before_modification": object_before_modification,
+            "undo": undo,
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
+        self.__modified__(modify_info)
 
+    @synchronized
     def pop(self, key):
-        object_before_modification = self.copy()
         r = super(NestedDict, self).pop(key)
+        self.__detach_child__(r)
         modify_info = {
             "type": type(self),
             "mode": "pop",
             "key": key,
-            "object_before_modification": object_before_modification,
+            "undo": UndoRecord("set", key, r),
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
+        self.__modified__(modify_info)
         return r
 
+    @synchronized
     def popitem(self, key):
-        object_before_modification = self.copy()
         r = super(NestedDict, self).popitem(key)
         modify_info = {
             "type": type(self),
             "mode": "popitem",
             "key": key,
-            "object_before_modification": object_before_modification,
+            "undo": UndoRecord("set", r[0], r[1]),
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
+        self.__modified__(modify_info)
         return r
-    
+
+    @synchronized
     def setdefault(self, key, default=None):
-        object_before_modification = self.copy()
-        r = super(NestedDict, self).setdefault(key, default=default)
+        undo = None if key in self else UndoRecord("delete", key)
+        r = super(NestedDict, self).setdefault(key, default if key in self else self.__convert_child__(default, key))
         modify_info = {
             "type": type(self),
             "mode": "setdefault",
             "key": key,
             "default": default,
-            "object_before_modification": object_before_modification,
+            "undo": undo,
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
+        self.__modified__(modify_info)
         return r
 
+    @synchronized
     def update(self, *args, **kwargs):
         DictUpdater.update(self, *args, **kwargs)
 
 
 # -------------------------------------------------------------------------------------------------------- Nested List Class
 class NestedList(list, ChildConverter, ParentCaller):
-    def __init__(self, parent, call_to_parent):
-        ParentCaller.__init__(self, parent, call_to_parent)
+    __slots__ = node_slots
+
+    def __init__(self, parent, key=None):
+        ParentCaller.__init__(self, parent, key)
+
+    def __reduce__(self):
+        # unpickled (and copied) lists are plain lists, the base class methods don't wrap the childs of lazy lists
+        return (list, (list(list.__iter__(self)), ))
 
     def __add__(self, item):
-        object_before_modification = self.copy()
-        super(NestedList, self).__add__(item)
-        modify_info = {
-            "type": type(self),
-            "mode": "add",
-            "item": item,
-            "object_before_modification": object_before_modification,
-            "object_after_modification": self
-        }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
+        # concatenation returns a new list and doesn't modify the data
+        return list(self) + list(item)
 
+    # Positive index of an item, like list.insert() would place it
+    def __normalize_index__(self, index):
+        if index < 0:
+            index = max(len(self) + index, 0)
+        return min(index, len(self))
+
+    # Update the keys of the nested childs after items have been shifted, beginning at 'start'
+    def __reindex__(self, start=0):
+        for i in range(start, len(self)):
+            item = super(NestedList, self).__getitem__(i)
+            if isinstance(item, ParentCaller):
+                item.key = i
+
+    @synchronized
     def __delitem__(self, index):
-        object_before_modification = self.copy()
+        removed = super(NestedList, self).__getitem__(index)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                undo = UndoRecord("insert", start, removed)
+            else:
+                undo = UndoRecord("restore", value=self.copy())
+        else:
+            start = self.__normalize_index__(index)
+            undo = UndoRecord("insert", start, [removed])
         super(NestedList, self).__delitem__(index)
+        if isinstance(index, slice):
+            self.__detach_childs__(removed)
+        else:
+            self.__detach_child__(removed)
+        self.__reindex__(start if undo.action == "insert" else 0)
         modify_info = {
             "type": type(self),
             "mode": "delitem",
             "index": index,
-            "object_before_modification": object_before_modification,
+            "undo": undo,
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
+        self.__modified__(modify_info)
 
     def __delslice__(self, i, j):
-        object_before_modification = self.copy()
+        undo = UndoRecord("restore", value=self.copy())
         super(NestedList, self).__delslice__(i, j)
+        self.__reindex__()
         modify_info = {
             "type": type(self),
             "mode": "delslice",
             "start": i,
             "end": j,
-            "object_before_modification": object_before_modification,
+            "undo": undo,
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
+        self.__modified__(modify_info)
 
+    @synchronized
     def __setitem__(self, index, value):
-        object_before_modification = self.copy()
-        super(NestedList, self).__setitem__(index, self.__convert_child__(value))
+        if not isinstance(index, slice) and self.__is_child__(index, value):
+            return
+        removed = super(NestedList, self).__getitem__(index)
+        size = len(self)
+        if isinstance(index, slice):
+            super(NestedList, self).__setitem__(index, [self.__convert_child__(item) for item in value])
+            start, stop, step = index.indices(size)
+            if step == 1:
+                # the assigned sequence may differ in length from the replaced slice
+                undo = UndoRecord("set", slice(start, start + len(removed) + len(self) - size), removed)
+                self.__reindex__(start)
+            else:
+                undo = UndoRecord("set", index, removed)
+                self.__reindex__()
+            self.__detach_childs__(removed)
+        else:
+            super(NestedList, self).__setitem__(index, self.__convert_child__(value, self.__normalize_index__(index)))
+            undo = UndoRecord("set", index, removed)
+            self.__detach_child__(removed)
         modify_info = {
             "type": type(self),
             "mode": "setitem",
             "index": index,
             "value": value,
-            "object_before_modification": object_before_modification,
+            "undo": undo,
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
-        
+        self.__modified__(modify_info)
+
     def __setslice__(self, i, j, y):
-        object_before_modification = self.copy()
+        undo = UndoRecord("restore", value=self.copy())
         super(NestedList, self).__setslice__(i, j, y)
+        self.__reindex__()
         modify_info = {
             "type": type(self),
             "mode": "setsclice",
             "start": i,
             "end": j,
             "sequence": y,
-            "object_before_modification": object_before_modification,
+            "undo": undo,
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
-        
+        self.__modified__(modify_info)
+
+    @synchronized
     def append(self, obj):
         '''L.append(object) -- append object to end'''
-        object_before_modification = self.copy()
-        super(NestedList, self).append(self.__convert_child__(obj))
+        super(NestedList, self).append(self.__convert_child__(obj, len(self)))
         modify_info = {
             "type": type(self),
             "mode": "append",
             "item": obj,
-            "object_before_modification": object_before_modification,
+            "undo": UndoRecord("delete", len(self) - 1),
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
-        
+        self.__modified__(modify_info)
+
+    @synchronized
     def extend(self, iterable):
         '''L.extend(iterable) -- extend list by appending elements from the iterable'''
-        object_before_modification = self.copy()
-        for item in iterable:
-            self.append(self.__convert_child__(item))
+        start = len(self)
+        undo = UndoRecord("delete", slice(start, None))
+        super(NestedList, self).extend([self.__convert_child__(item, start + i) for i, item in enumerate(iterable)])
         modify_info = {
             "type": type(self),
             "mode": "extend",
             "iterable": iterable,
-            "object_before_modification": object_before_modification,
+            "undo": undo,
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
-        
+        self.__modified__(modify_info)
+
+    def __iadd__(self, iterable):
+        self.extend(iterable)
+        return self
+
+    @synchronized
+    def __imul__(self, n):
+        size = len(self)
+        if n <= 0:
+            undo = UndoRecord("restore", value=self.copy())
+            self.__detach_childs__(undo.value)
+            super(NestedList, self).clear()
+        else:
+            # nested objects can't be shared by several indexes, so the repetitions are converted copies
+            items = list(list.__iter__(self))
+            undo = UndoRecord("delete", slice(size, None))
+            super(NestedList, self).extend([self.__convert_child__(item, size * repetition + i) for repetition in range(1, n) for i, item in enumerate(items)])
+        modify_info = {
+            "type": type(self),
+            "mode": "imul",
+            "value": n,
+            "undo": undo,
+            "object_after_modification": self
+        }
+        self.__modified__(modify_info)
+        return self
+
+    @synchronized
     def insert(self, index, item):
         '''L.insert(index, object) -- insert object before index'''
-        object_before_modification = self.copy()
-        super(NestedList, self).insert(index, self.__convert_child__(item))
+        position = self.__normalize_index__(index)
+        undo = UndoRecord("delete", position)
+        super(NestedList, self).insert(position, self.__convert_child__(item, position))
+        self.__reindex__(position + 1)
         modify_info = {
             "type": type(self),
             "mode": "insert",
             "index": index,
             "item": item,
-            "object_before_modification": object_before_modification,
+            "undo": undo,
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
-        
+        self.__modified__(modify_info)
+
+    @synchronized
     def pop(self, index=-1):
         '''L.pop([index]) -> item -- remove and return item at index (default last).
         Raises IndexError if list is empty or index is out of range.'''
-        object_before_modification = self.copy()
         r = super(NestedList, self).pop(index)
+        self.__detach_child__(r)
+        # the list is one item shorter now, so a negative index is shifted by one
+        position = index + len(self) + 1 if index < 0 else index
+        self.__reindex__(position)
         modify_info = {
             "type": type(self),
             "mode": "pop",
             "index": index,
-            "object_before_modification": object_before_modification,
+            "undo": UndoRecord("insert", position, [r]),
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
+        self.__modified__(modify_info)
         return r
-        
+
+    @synchronized
     def remove(self, value):
         '''L.remove(value) -- remove first occurrence of value.
         Raises ValueError if the value is not present.'''
-        object_before_modification = self.copy()
-        super(NestedList, self).remove(value)
+        index = self.index(value)
+        removed = super(NestedList, self).__getitem__(index)
+        super(NestedList, self).__delitem__(index)
+        self.__detach_child__(removed)
+        self.__reindex__(index)
         modify_info = {
             "type": type(self),
             "mode": "remove",
             "value": value,
-            "object_before_modification": object_before_modification,
+            "undo": UndoRecord("insert", index, [removed]),
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
-        
+        self.__modified__(modify_info)
+
+    @synchronized
     def clear(self):
-        object_before_modification = self.copy()
+        undo = UndoRecord("restore", value=self.copy())
+        self.__detach_childs__(undo.value)
         super(NestedList, self).clear()
         modify_info = {
             "type": type(self),
             "mode": "clear",
-            "object_before_modification": object_before_modification,
+            "undo": undo,
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
-        
+        self.__modified__(modify_info)
+
+    @synchronized
     def reverse(self):
         '''L.reverse() -- reverse *IN PLACE*'''
-        object_before_modification = self.copy()
         super(NestedList, self).reverse()
+        self.__reindex__()
         modify_info = {
             "type": type(self),
             "mode": "reverse",
-            "object_before_modification": object_before_modification,
+            "undo": UndoRecord("reverse"),
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
-        
+        self.__modified__(modify_info)
+
+    @synchronized
     def sort(self, key=None, reverse=False):
         '''L.sort(cmp=None, key=None, reverse=False) -- stable sort *IN PLACE*;
         cmp(x, y) -> -1, 0, 1'''
-        object_before_modification = self.copy()
+        undo = UndoRecord("restore", value=self.copy())
         super(NestedList, self).sort(key=key, reverse=reverse)
+        self.__reindex__()
         modify_info = {
             "type": type(self),
             "mode": "sort",
             "key": key,
             "reverse": reverse,
-            "object_before_modification": object_before_modification,
+            "undo": undo,
             "object_after_modification": self
         }
-        self.call_to_parent(object_after_modification=self, modify_info=modify_info, data_tree=[self])
+        self.__modified__(modify_info)
 
-# -------------------------------------------------------------------------------------------------------- Dicta Class
-class Dicta(dict, ChildConverter, DictUpdater):
-    '''
-    A dict subclass that observes a nested dict and listens for changes in its data 
-    structure. If a data change is registered, Dicta reacts with a callback 
-    or a data-export to a JSON file.
+# -------------------------------------------------------------------------------------------------------- Nested Array Classes
+# Typed numeric arrays. An array.array (or a NumPy array of numbers) that is added to Dicta becomes a 
+# NestedArray (NestedNdarray). The numbers are stored unboxed in the buffer of the array, they are not 
+# converted one by one, and the array is serialized from its buffer. Bulk operations (slice assignment, 
+# extend(), frombytes(), in-place operators of NumPy arrays) throw a single event.
+class NestedArray(array.array, ParentCaller):
+    __slots__ = node_slots
 
-    Automatically write data to a JSON file, when the nested data structure changes (optional)
-    Throw a callback method, when the nested data structure changes (optional)
+    def __new__(cls, parent, typecode, initializer=(), key=None):
+        return super(NestedArray, cls).__new__(cls, typecode, initializer)
 
-    Behaves like a regular dict and supports all dict and list methods like pop(), append(), slice()...
-    Supports nesting of all possible datatypes like dict, list, tuple, set and other objects like custom classes.
-    Writing data to a file will encode a non-serializable object to a binary-string.
-    Reading data from a file will decode a binary-string back to a non-serializable object.
-    You can import additional data from json files.
-    You can export data to json files.
-    
-    How to use:
-    data = Dicta()
-    data = Dicta(dict)
-    '''
-    
-    # --------------------------------- Private Methods
-    def __init__(self, *args, **kwargs):
-        self.path = None
-        self.__prev_data_string = None
-        self.callback = None
-        self.get_event = False
-        self.binary_serializer = False
-        self.serializer_hook = default_serializer_hook
-        self.update(*args, **kwargs)
+    def __init__(self, parent, typecode, initializer=(), key=None):
+        ParentCaller.__init__(self, parent, key)
 
-    def __call_from_child__(self, object_after_modification, modify_info, data_tree):
-        self.__current_data_string = self.stringify()
-        if self.__current_data_string != self.__prev_data_string:
-            if hasattr(self, 'path') and self.path:
-                self.__export_file(self.path)
-            if hasattr(self, 'callback') and self.callback:
-                data_tree.insert(0, self)
-                modify_info["data_tree"] = data_tree
-                if self.get_event:
-                    self.callback(modify_info)
-                else:
-                    self.callback()
-            self.__prev_data_string = self.__current_data_string
+    def __repr__(self):
+        return repr(self.copy())
 
-    def __setitem__(self, key, val):
-        object_before_modification = self.copy()
-        super(Dicta, self).__setitem__(key, self.__convert_child__(val))
-        if hasattr(self, 'callback') and self.callback:
-            if self.get_event:
-                modify_info = {
-                    "type": type(self),
-                    "mode": "setitem",
-                    "key": key,
-                    "value": val,
-                    "object_before_modification": object_before_modification,
-                    "object_after_modification": self
-                }
+    def __reduce_ex__(self, protocol):
+        # unpickled (and copied) arrays are plain arrays
+        return self.copy().__reduce_ex__(protocol)
+
+    def copy(self):
+        return array.array(self.typecode, self)
+
+    # Sequences of numbers and buffers are converted to an array of the own typecode
+    def __as_array__(self, value):
+        if isinstance(value, array.array) and value.typecode == self.typecode:
+            return value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            converted = array.array(self.typecode)
+            converted.frombytes(value)
+            return converted
+        return array.array(self.typecode, value)
+
+    @synchronized
+    def __setitem__(self, index, value):
+        removed = super(NestedArray, self).__getitem__(index)
+        if isinstance(index, slice):
+            size = len(self)
+            super(NestedArray, self).__setitem__(index, self.__as_array__(value))
+            start, stop, step = index.indices(size)
+            # the assigned sequence may differ in length from the replaced slice
+            undo = UndoRecord("set", slice(start, start + len(removed) + len(self) - size) if step == 1 else index, removed)
+        else:
+            super(NestedArray, self).__setitem__(index, value)
+            undo = UndoRecord("set", index, removed)
+        modify_info = {
+            "type": type(self),
+            "mode": "setitem",
+            "index": index,
+            "value": value,
+            "undo": undo,
+            "object_after_modification": self
+        }
+        self.__modified__(modify_info)
+
+    @synchronized
+    def __delitem__(self, index):
+        removed = super(NestedArray, self).__getitem__(index)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            undo = UndoRecord("insert", start, removed) if step == 1 else UndoRecord("restore", value=self.copy())
+        else:
+            undo = UndoRecord("insert", index % len(self), array.array(self.typecode, [removed]))
+        super(NestedArray, self).__delitem__(index)
+        modify_info = {
+            "type": type(self),
+            "mode": "delitem",
+            "index": index,
+            "undo": undo,
+            "object_after_modification": self
+        }
+        self.__modified__(modify_info)
+
+    @synchronized
+    def append(self, item):
+        super(NestedArray, self).append(item)
+        modify_info = {
+            "type": type(self),
+            "mode": "append",
+            "item": item,
+            "undo": UndoRecord("delete", len(self) - 1),
+            "object_after_modification": self
+        }
+        self.__modified__(modify_info)
+
+    @synchronized
+    def extend(self, iterable):
+        start = len(self)
+        super(NestedArray, self).extend(self.__as_array__(iterable))
+        modify_info = {
+            "type": type(self),
+            "mode": "extend",
+            "iterable": iterable,
+            "undo": UndoRecord("delete", slice(start, None)),
+            "object_after_modification": self
+        }
+        self.__modified__(modify_info)
+
+    def __iadd__(self, iterable):
+        self.extend(iterable)
+        return self
+
+    @synchronized
+    def frombytes(self, buffer):
+        start = len(self)
+        super(NestedArray, self).frombytes(buffer)
+        modify_info = {
+            "type": type(self),
+            "mode": "frombytes",
+            "iterable": buffer,
+            "undo": UndoRecord("delete", slice(start, None)),
+            "object_after_modification": self
+        }
+        self.__modified__(modify_info)
+
+    def fromlist(self, items):
+        self.extend(items)
+
+    @synchronized
+    def __imul__(self, n):
+        size = len(self)
+        undo = UndoRecord("restore", value=self.copy()) if n <= 0 else UndoRecord("delete", slice(size, None))
+        super(NestedArray, self).__imul__(n)
+        modify_info = {
+            "type": type(self),
+            "mode": "imul",
+            "value": n,
+            "undo": undo,
+            "object_after_modification": self
+        }
+        self.__modified__(modify_info)
+        return self
+
+    @synchronized
+    def insert(self, index, item):
+        position = min(max(len(self) + index, 0) if index < 0 else index, len(self))
+        super(NestedArray, self).insert(position, item)
+        modify_info = {
+            "type": type(self),
+            "mode": "insert",
+            "index": index,
+            "item": item,
+            "undo": UndoRecord("delete", position),
+            "object_after_modification": self
+        }
+        self.__modified__(modify_info)
+
+    @synchronized
+    def pop(self, index=-1):
+        r = super(NestedArray, self).pop(index)
+        # the array is one item shorter now, so a negative index is shifted by one
+        position = index + len(self) + 1 if index < 0 else index
+        modify_info = {
+            "type": type(self),
+            "mode": "pop",
+            "index": index,
+            "undo": UndoRecord("insert", position, array.array(self.typecode, [r])),
+            "object_after_modification": self
+        }
+        self.__modified__(modify_info)
+        return r
+
+    @synchronized
+    def remove(self, value):
+        index = self.index(value)
+        removed = super(NestedArray, self).__getitem__(index)
+        super(NestedArray, self).__delitem__(index)
+        modify_info = {
+            "type": type(self),
+            "mode": "remove",
+            "value": value,
+            "undo": UndoRecord("insert", index, array.array(self.typecode, [removed])),
+            "object_after_modification": self
+        }
+        self.__modified__(modify_info)
+
+    @synchronized
+    def reverse(self):
+        super(NestedArray, self).reverse()
+        modify_info = {
+            "type": type(self),
+            "mode": "reverse",
+            "undo": UndoRecord("reverse"),
+            "object_after_modification": self
+        }
+        self.__modified__(modify_info)
+
+    @synchronized
+    def byteswap(self):
+        undo = UndoRecord("restore", value=self.copy())
+        super(NestedArray, self).byteswap()
+        modify_info = {
+            "type": type(self),
+            "mode": "byteswap",
+            "undo": undo,
+            "object_after_modification": self
+        }
+        self.__modified__(modify_info)
+
+
+# NumPy arrays of a fixed size. Views and results of operations are plain NumPy arrays that don't 
+# belong to the tree, so modifying them doesn't throw events. Like for tuples, non-empty __slots__ 
+# are not supported, so the arrays keep an instance dict.
+# Writes are detected through __setitem__, the in-place methods below and __array_ufunc__: every ufunc 
+# that writes into a nested array (out=..., ufunc.at(), all in-place operators) throws one event. 
+# NumPy functions that write into the buffer without a ufunc (numpy.copyto(), numpy.place(), 
+# numpy.putmask(), numpy.fill_diagonal()...) and writes through views are not detected: the data 
+# changes without an event, the sync file is not written and stringify() returns the cached fragment.
+if numpy is not None:
+    class NestedNdarray(numpy.ndarray, ParentCaller):
+        def __new__(cls, parent, data, key=None):
+            return numpy.array(data).view(cls)
+
+        def __init__(self, parent, data, key=None):
+            ParentCaller.__init__(self, parent, key)
+
+        def __array_finalize__(self, obj):
+            ParentCaller.__init__(self, None)
+
+        def __array_wrap__(self, obj, *args, **kwargs):
+            return obj.view(numpy.ndarray) if type(obj) is NestedNdarray else obj
+
+        def __getitem__(self, index):
+            item = super(NestedNdarray, self).__getitem__(index)
+            return item.view(numpy.ndarray) if type(item) is NestedNdarray else item
+
+        def __repr__(self):
+            return repr(self.copy())
+
+        def __reduce_ex__(self, protocol):
+            return self.copy().__reduce_ex__(protocol)
+
+        # ndarray copies subclasses by __copy__() and __deepcopy__(), copies are plain arrays as well
+        def __copy__(self):
+            return self.copy()
+
+        def __deepcopy__(self, memo):
+            return self.view(numpy.ndarray).__deepcopy__(memo)
+
+        def copy(self, order="C"):
+            return numpy.array(self, order=order)
+
+        # Only the replaced values are copied for the undo record
+        @synchronized
+        def __setitem__(self, index, value):
+            undo = UndoRecord("set", index, self.view(numpy.ndarray)[index].copy())
+            super(NestedNdarray, self).__setitem__(index, value)
+            modify_info = {
+                "type": type(self),
+                "mode": "setitem",
+                "index": index,
+                "value": value,
+                "undo": undo,
+                "object_after_modification": self
+            }
+            self.__modified__(modify_info)
+
+        # Elementwise update of the whole array with a single event. The undo record holds a copy of the array.
+        @synchronized
+        def __update(self, mode, update, operand=None):
+            undo = UndoRecord("restore", value=self.copy())
+            update(self.view(numpy.ndarray), operand)
+            modify_info = {
+                "type": type(self),
+                "mode": mode,
+                "value": operand,
+                "undo": undo,
+                "object_after_modification": self
+            }
+            self.__modified__(modify_info)
+            return self
+
+        # Ufuncs are computed on plain arrays. Nested arrays that are written by the ufunc (out=..., 
+        # ufunc.at()) throw an event each. They are returned instead of their plain views, so 
+        # 'd["n"] //= 2' assigns the nested array to its own key again.
+        def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+            out = kwargs.get("out") or ()
+            targets = [array for array in out if isinstance(array, NestedNdarray)]
+            if method == "at" and isinstance(inputs[0], NestedNdarray):
+                targets.append(inputs[0])
+            inputs = tuple(array.view(numpy.ndarray) if isinstance(array, NestedNdarray) else array for array in inputs)
+            if out:
+                kwargs["out"] = tuple(array.view(numpy.ndarray) if isinstance(array, NestedNdarray) else array for array in out)
+            if not targets:
+                return getattr(ufunc, method)(*inputs, **kwargs)
+            lock = self.__lock__()
+            with lock.write() if lock is not None else contextlib.nullcontext():
+                undos = [UndoRecord("restore", value=target.copy()) for target in targets]
+                result = getattr(ufunc, method)(*inputs, **kwargs)
+                for target, undo in zip(targets, undos):
+                    modify_info = {
+                        "type": type(target),
+                        "mode": ufunc.__name__ if method == "__call__" else ufunc.__name__ + "." + method,
+                        "value": inputs,
+                        "undo": undo,
+                        "object_after_modification": target
+                    }
+                    target.__modified__(modify_info)
+            if method == "at":
+                return result
+            if isinstance(result, tuple):
+                return tuple(array if isinstance(array, NestedNdarray) else r for r, array in zip(result, out))
+            return out[0] if isinstance(out[0], NestedNdarray) else result
+
+        def __iadd__(self, other):
+            return self.__update("iadd", numpy.ndarray.__iadd__, other)
+
+        def __isub__(self, other):
+            return self.__update("isub", numpy.ndarray.__isub__, other)
+
+        def __imul__(self, other):
+            return self.__update("imul", numpy.ndarray.__imul__, other)
+
+        def __itruediv__(self, other):
+            return self.__update("itruediv", numpy.ndarray.__itruediv__, other)
+
+        def fill(self, value):
+            self.__update("fill", numpy.ndarray.fill, value)
+
+        def sort(self, axis=-1):
+            self.__update("sort", numpy.ndarray.sort, axis)
+
+        def put(self, indices, values, mode="raise"):
+            self.__update("put", lambda array, values: array.put(indices, values, mode), values)
+
+        def partition(self, kth, axis=-1, kind="introselect", order=None):
+            self.__update("partition", lambda array, kth: array.partition(kth, axis, kind, order), kth)
+
+        def byteswap(self, inplace=False):
+            if not inplace:
+                return self.view(numpy.ndarray).byteswap()
+            return self.__update("byteswap", lambda array, operand: array.byteswap(True))
+else:
+    NestedNdarray = None
+
+
+# -------------------------------------------------------------------------------------------------------- Lazy Classes
+# NestedDict and NestedList that store their childs unconverted and convert them on their first access
+# (see Dicta.set_lazy()). Loading large data converts only what is actually used.
+class LazyNestedDict(NestedDict):
+    __slots__ = ()
+
+    def __lazy__(self):
+        return True
+
+    def __getitem__(self, key):
+        return self.__wrap_child__(key, super(LazyNestedDict, self).__getitem__(key))
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def setdefault(self, key, default=None):
+        super(LazyNestedDict, self).setdefault(key, default)
+        return self[key]
+
+    def __wrap_childs__(self):
+        for key, value in dict.items(self):
+            if type(value) in plain_types:
+                self.__wrap_child__(key, value)
+
+    def values(self):
+        self.__wrap_childs__()
+        return super(LazyNestedDict, self).values()
+
+    def items(self):
+        self.__wrap_childs__()
+        return super(LazyNestedDict, self).items()
+
+
+class LazyNestedList(NestedList):
+    __slots__ = ()
+
+    def __lazy__(self):
+        return True
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            for i in range(*index.indices(len(self))):
+                self.__wrap_child__(i, super(LazyNestedList, self).__getitem__(i))
+            return super(LazyNestedList, self).__getitem__(index)
+        if index < 0:
+            index += len(self)
+        return self.__wrap_child__(index, super(LazyNestedList, self).__getitem__(index))
+
+    def __wrap_childs__(self):
+        for i, value in enumerate(list.__iter__(self)):
+            if type(value) in plain_types:
+                self.__wrap_child__(i, value)
+
+    def __iter__(self):
+        self.__wrap_childs__()
+        return super(LazyNestedList, self).__iter__()
+
+    def __reversed__(self):
+        self.__wrap_childs__()
+        return super(LazyNestedList, self).__reversed__()
+
+
+# -------------------------------------------------------------------------------------------------------- Sync File Writer Class
+# Writes the sync file in a background thread, so modifications don't wait for disk I/O.
+# Modifications only mark the data as dirty. The writer flushes at most once per interval.
+class SyncFileWriter():
+    def __init__(self, flush, interval):
+        # keep a weak reference only, the writer thread must not keep Dicta alive
+        self.flush = weakref.WeakMethod(flush)
+        self.interval = interval
+        self.__dirty = threading.Event()
+        self.__closed = False
+        self.__thread = threading.Thread(target=self.__run, name="dicta-sync-file-writer", daemon=True)
+        self.__thread.start()
+        atexit.register(self.close)
+
+    def __run(self):
+        while not self.__closed:
+            self.__dirty.wait()
+            if self.__closed:
+                return
+            time.sleep(self.interval)
+            self.__dirty.clear()
+            flush = self.flush()
+            if flush is None:
+                return
+            try:
+                flush()
+            except Exception as e:
+                print("ERROR!: Dicta: Could not write sync file: {}".format(e))
+            del flush
+
+    def notify(self):
+        self.__dirty.set()
+
+    def close(self):
+        '''Stop the writer thread and write pending modifications'''
+        if self.__closed:
+            return
+        self.__closed = True
+        self.__dirty.set()
+        atexit.unregister(self.close)
+        if self.__thread is not threading.current_thread():
+            self.__thread.join()
+        flush = self.flush()
+        if flush is not None:
+            flush()
+
+
+# -------------------------------------------------------------------------------------------------------- Sync Journal Class
+# State of the change journal of a sync file (see Dicta.bind_file(path, storage="journal"))
+class SyncJournal():
+    def __init__(self, compact_ratio, compact_min_bytes):
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self.lock = threading.Lock()
+        # encoded records that are not written yet and their size
+        self.buffer = []
+        self.pending = 0
+        # size of the journal file and of the snapshot (the sync file)
+        self.size = 0
+        self.snapshot_size = 0
+        self.compacting = False
+
+
+# -------------------------------------------------------------------------------------------------------- Sync File Lock Class
+# Advisory lock of a sync file that is shared by several processes (see Dicta.bind_file(path, shared=True)).
+# The sync file is replaced on every write, so the lock is held on '<path>.lock'. The lock file stores
+# the generation of the sync file, which is counted up by every write. A process that finds another
+# generation than the one it loaded or wrote last knows that another process modified the sync file.
+# The lock is reentrant for the thread that holds it, so the data can be modified while the lock is held.
+class SyncFileLock():
+    def __init__(self, path):
+        self.path = path + ".lock"
+        self.__thread_lock = threading.RLock()
+        self.__file = None
+        self.__depth = 0
+
+    @contextlib.contextmanager
+    def lock(self, exclusive=True):
+        with self.__thread_lock:
+            if not self.__depth:
+                self.__file = open(self.path, "a+")
+                fcntl.flock(self.__file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self.__depth += 1
+            try:
+                yield self
+            finally:
+                self.__depth -= 1
+                if not self.__depth:
+                    fcntl.flock(self.__file.fileno(), fcntl.LOCK_UN)
+                    self.__file.close()
+                    self.__file = None
+
+    def generation(self):
+        '''The generation of the sync file. The lock must be held'''
+        self.__file.seek(0)
+        content = self.__file.read().strip()
+        return int(content) if content else 0
+
+    def set_generation(self, generation):
+        '''Store the generation of the sync file. The exclusive lock must be held'''
+        self.__file.seek(0)
+        self.__file.truncate()
+        self.__file.write(str(generation))
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+
+
+# Raised if the sync file was modified by another process (see Dicta.bind_file(path, shared=True, on_conflict="raise"))
+class SyncConflictError(Exception):
+    pass
+
+
+# -------------------------------------------------------------------------------------------------------- Async Classes
+# Coroutine callback (see Dicta.bind_callback()). The events are queued and the callback is awaited
+# for one event after the other on the event loop, so the events arrive in the order of the modifications.
+# Modifications in other threads are passed to the loop the callback was first called on.
+class AsyncCallback():
+    def __init__(self, callback):
+        self.callback = callback
+        self.loop = None
+        self.events = collections.deque()
+        self.task = None
+
+    def __call__(self, *args):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            self.loop = loop
+            self.__schedule(args)
+        elif self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.__schedule, args)
+        else:
+            # no event loop is running: await the callback right away
+            asyncio.run(self.callback(*args))
+
+    def __schedule(self, args):
+        self.events.append(args)
+        if self.task is None:
+            self.task = self.loop.create_task(self.__run())
+
+    async def __run(self):
+        try:
+            while self.events:
+                args = self.events.popleft()
+                try:
+                    await self.callback(*args)
+                except Exception as e:
+                    print("ERROR!: Dicta: Async callback failed: {}".format(e))
+        finally:
+            self.task = None
+
+    async def join(self):
+        '''Wait until all queued events are passed to the callback'''
+        while self.task is not None and self.task is not asyncio.current_task():
+            await asyncio.shield(self.task)
+
+
+# Writes the sync file from the event loop (see Dicta.bind_file(path, write_mode="async")). Modifications
+# schedule a write after the debounce interval, which serializes and writes the data in the default executor.
+# Modifications without a running event loop write the sync file right away.
+class AsyncSyncFileWriter():
+    def __init__(self, flush, interval):
+        # keep a weak reference only, a pending write must not keep Dicta alive
+        self.flush = weakref.WeakMethod(flush)
+        self.interval = interval
+        self.task = None
+        atexit.register(self.close)
+
+    def notify(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is None:
+            self.__flush()
+        elif self.task is None:
+            self.task = loop.create_task(self.__run())
+
+    def __flush(self):
+        flush = self.flush()
+        if flush is not None:
+            flush()
+
+    async def __run(self):
+        try:
+            await asyncio.sleep(self.interval)
+        finally:
+            # modifications during the write schedule the next write
+            self.task = None
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.__flush)
+        except Exception as e:
+            print("ERROR!: Dicta: Could not write sync file: {}".format(e))
+
+    def close(self):
+        '''Cancel the scheduled write and write pending modifications'''
+        atexit.unregister(self.close)
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+        self.task = None
+        self.__flush()
+
+
+# -------------------------------------------------------------------------------------------------------- JSON Stream Class
+# Incremental reader for a JSON object file (see Dicta.pull(path, stream=True)). The file is read 
+# in chunks and only the value that is currently decoded is held in memory.
+# The members of the object are read one by one and the items of arrays in the object are 
+# read one by one, every other value is decoded as a whole.
+# json.load() shares equal keys of all objects in the file, the stream shares them across its values.
+class JSONStream():
+    def __init__(self, f, object_hook=None, read_size=65536):
+        self.f = f
+        self.object_hook = object_hook
+        self.keys = {}
+        self.decoder = json.JSONDecoder(object_pairs_hook=self.__object)
+        self.read_size = read_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def __object(self, pairs):
+        keys = self.keys
+        obj = {keys.setdefault(key, key): value for key, value in pairs}
+        if self.object_hook:
+            return self.object_hook(obj)
+        return obj
+
+    # Read at least 'size' more characters. Returns False at the end of the file
+    def __fill(self, size=0):
+        if self.eof:
+            return False
+        data = self.f.read(max(size, self.read_size))
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    # The next non-whitespace character, without consuming it ("" at the end of the file)
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\n\r":
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.__fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError("Expecting one of '{}'".format(chars), self.buffer, self.pos)
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # the value is incomplete, read as much again as is buffered to keep retries rare
+                if not self.__fill(len(self.buffer) - self.pos):
+                    raise
+                continue
+            # a number may continue in the next chunk, even after a valid prefix like '1.5' of '1.5e3'
+            if end < len(self.buffer) and self.buffer[end] not in "+-.eE0123456789" or not self.__fill():
+                self.pos = end
+                return value
+
+    # Yields the keys of the object. The value of every key must be read (value() or items()) before the next key
+    def members(self):
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise json.JSONDecodeError("Expecting property name enclosed in double quotes", self.buffer, self.pos)
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+    # Yields the items of an array
+    def items(self):
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+# -------------------------------------------------------------------------------------------------------- History Classes
+# Read-only snapshots of the data (see Dicta.snapshot()). Snapshots are persistent: every nested object caches
+# its snapshot together with the version it was taken at (see ParentCaller), so a new snapshot only rebuilds
+# the objects that were modified since and shares the snapshots of all other objects with older snapshots.
+# Keeping many versions of a large tree costs memory for what changed, not for copies of the tree.
+# Objects of other types than the nested objects (e.g. custom objects) are shared by reference.
+class FrozenDict(dict):
+    __slots__ = ()
+
+    def __readonly(self, *args, **kwargs):
+        raise TypeError("Dicta: Snapshots are read-only.")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = __readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self), ))
+
+
+class FrozenList(tuple):
+    __slots__ = ()
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class FrozenSet(frozenset):
+    __slots__ = ()
+
+    def __repr__(self):
+        return repr(set(self))
+
+
+# Snapshot of a NestedArray. Snapshots of NestedNdarray are read-only NumPy arrays.
+class FrozenArray(array.array):
+    __slots__ = ()
+
+    def __readonly(self, *args, **kwargs):
+        raise TypeError("Dicta: Snapshots are read-only.")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = append = byteswap = extend = frombytes = fromfile = fromlist = fromunicode = insert = pop = remove = reverse = __readonly
+
+    def __repr__(self):
+        return repr(copy_array(self))
+
+    def __reduce_ex__(self, protocol):
+        return copy_array(self).__reduce_ex__(protocol)
+
+
+def freeze(obj):
+    '''Returns the snapshot of a nested object or of plain data'''
+    if type(obj) in (FrozenDict, FrozenList, FrozenSet, FrozenArray):
+        return obj
+    if isinstance(obj, ParentCaller):
+        cached = obj.snapshot
+        if cached is not None and cached[0] == obj.version:
+            return cached[1]
+    if isinstance(obj, dict):
+        frozen = FrozenDict([(key, freeze(value)) for key, value in dict.items(obj)])
+    elif isinstance(obj, list):
+        frozen = FrozenList([freeze(item) for item in list.__iter__(obj)])
+    elif isinstance(obj, tuple):
+        frozen = tuple([freeze(item) for item in obj])
+    elif isinstance(obj, set):
+        frozen = FrozenSet(obj)
+    elif isinstance(obj, array.array):
+        frozen = FrozenArray(obj.typecode, obj)
+    elif isinstance(obj, ParentCaller) and isinstance(obj, array_types):
+        frozen = copy_array(obj)
+        frozen.flags.writeable = False
+    else:
+        return obj
+    if isinstance(obj, ParentCaller):
+        obj.snapshot = (obj.version, frozen)
+    return frozen
+
+def thaw(frozen):
+    '''Returns plain data of a snapshot, which is converted to nested objects when it is added'''
+    if type(frozen) is FrozenDict:
+        return {key: thaw(value) for key, value in dict.items(frozen)}
+    elif type(frozen) is FrozenList:
+        return [thaw(item) for item in frozen]
+    elif type(frozen) is tuple:
+        return tuple([thaw(item) for item in frozen])
+    elif type(frozen) is FrozenSet:
+        return set(frozen)
+    elif type(frozen) is FrozenArray or (numpy is not None and type(frozen) is numpy.ndarray and not frozen.flags.writeable):
+        return copy_array(frozen)
+    return frozen
+
+
+# Snapshots of Dicta (see Dicta.snapshot(), Dicta.undo(), Dicta.redo()). 'position' is the snapshot
+# the data was restored to or taken at last. 'version' is the version of Dicta at that moment, so
+# later modifications are detected.
+class History():
+    def __init__(self, limit):
+        self.limit = limit
+        self.entries = []
+        self.position = -1
+        self.version = None
+
+
+# -------------------------------------------------------------------------------------------------------- Subscription Index Class
+# Prefix tree of the path patterns of Dicta.subscribe(). Every node is a path segment ("*" matches any
+# segment). A modification is matched by walking down the tree along the segments of its path, so its cost
+# depends on the depth of the path and the matching subscriptions, not on the number of subscriptions.
+# A subscription matches modifications at and below its path and modifications of its parents.
+class SubscriptionNode():
+    __slots__ = ("children", "subscriptions")
+
+    def __init__(self):
+        self.children = {}
+        self.subscriptions = []
+
+
+class Subscription():
+    __slots__ = ("number", "pattern", "callback", "handler")
+
+    def __init__(self, number, pattern, callback, handler):
+        self.number = number
+        self.pattern = pattern
+        self.callback = callback
+        self.handler = handler
+
+
+class SubscriptionIndex():
+    def __init__(self):
+        self.root = SubscriptionNode()
+        self.count = 0
+        self.__numbers = 0
+
+    def tokens(self, path):
+        return [token for token in path.split("/") if token]
+
+    def add(self, pattern, callback, handler):
+        node = self.root
+        for token in self.tokens(pattern):
+            node = node.children.setdefault(token, SubscriptionNode())
+        self.__numbers += 1
+        node.subscriptions.append(Subscription(self.__numbers, pattern, callback, handler))
+        self.count += 1
+
+    def remove(self, pattern, callback):
+        '''Remove a subscription and the nodes that are left without subscriptions'''
+        nodes = [self.root]
+        tokens = self.tokens(pattern)
+        for token in tokens:
+            node = nodes[-1].children.get(token)
+            if node is None:
+                return False
+            nodes.append(node)
+        subscriptions = nodes[-1].subscriptions
+        for i, subscription in enumerate(subscriptions):
+            if subscription.callback == callback:
+                del subscriptions[i]
+                self.count -= 1
+                break
+        else:
+            return False
+        for token, parent, node in zip(reversed(tokens), reversed(nodes[:-1]), reversed(nodes)):
+            if node.subscriptions or node.children:
+                break
+            del parent.children[token]
+        return True
+
+    def reaches(self, tokens):
+        '''Whether a modification below the path of 'tokens' (escaped segments) may match a subscription.
+        The walk stops at the first segment that leaves the tree, so unrelated subtrees cost O(1).'''
+        nodes = [self.root]
+        for token in tokens:
+            next_nodes = []
+            for node in nodes:
+                if node.subscriptions:
+                    return True
+                child = node.children.get(token)
+                if child is not None:
+                    next_nodes.append(child)
+                if token != "*":
+                    child = node.children.get("*")
+                    if child is not None:
+                        next_nodes.append(child)
+            nodes = next_nodes
+            if not nodes:
+                return False
+        # empty nodes are pruned, so there are subscriptions at or below the path
+        return True
+
+    def match(self, path, found):
+        '''Add the subscriptions that match a modification at 'path' to 'found' (number: subscription)'''
+        nodes = [self.root]
+        for token in self.tokens(path):
+            next_nodes = []
+            for node in nodes:
+                # the subscribed path is a parent of the modification
+                for subscription in node.subscriptions:
+                    found[subscription.number] = subscription
+                child = node.children.get(token)
+                if child is not None:
+                    next_nodes.append(child)
+                if token != "*":
+                    child = node.children.get("*")
+                    if child is not None:
+                        next_nodes.append(child)
+            nodes = next_nodes
+            if not nodes:
+                return
+        # the subscribed path is the modified path or one of its children
+        while nodes:
+            node = nodes.pop()
+            for subscription in node.subscriptions:
+                found[subscription.number] = subscription
+            nodes.extend(node.children.values())
+
+
+# -------------------------------------------------------------------------------------------------------- Record Index Class
+# Secondary index of a field of the records (dicts) of a list (see Dicta.create_index()). 'buckets' maps
+# every value of the field to the records that hold it, 'values' maps every indexed record to its value.
+# Records are indexed by identity, so moving them inside the list (insert, sort...) doesn't touch the index.
+# An ordered index keeps the distinct values sorted for range queries. Records whose value is unhashable
+# (e.g. a list) are not indexed, values that can't be compared with the others are left out of the order.
+class RecordIndex():
+    def __init__(self, path, depth, field, ordered=False):
+        self.path = path
+        # the number of segments of the path
+        self.depth = depth
+        self.field = field
+        self.ordered = ordered
+        # the indexed list, None if the index has to be rebuilt
+        self.node = None
+        self.buckets = {}
+        self.values = {}
+        self.order = []
+
+    # The list is assigned when the index is complete, so queries of other threads don't use it meanwhile
+    def build(self, node):
+        self.node = None
+        self.buckets = {}
+        self.values = {}
+        self.order = []
+        for record in node:
+            self.add(record)
+        self.node = node
+
+    def add(self, record):
+        if not isinstance(record, dict) or not dict.__contains__(record, self.field):
+            return
+        value = dict.__getitem__(record, self.field)
+        try:
+            bucket = self.buckets.get(value)
+        except TypeError:
+            return
+        if bucket is None:
+            bucket = self.buckets[value] = {}
+            if self.ordered:
+                try:
+                    bisect.insort(self.order, value)
+                except TypeError:
+                    pass
+        bucket[id(record)] = record
+        self.values[id(record)] = value
+
+    def discard(self, record):
+        if id(record) not in self.values:
+            return
+        value = self.values.pop(id(record))
+        bucket = self.buckets[value]
+        del bucket[id(record)]
+        if not bucket:
+            del self.buckets[value]
+            if self.ordered:
+                try:
+                    position = bisect.bisect_left(self.order, value)
+                except TypeError:
+                    return
+                if position < len(self.order) and self.order[position] == value:
+                    del self.order[position]
+
+    # A record or one of its childs was modified, its value may have changed
+    def update(self, record):
+        if id(record) in self.values:
+            value = dict.get(record, self.field, self)
+            indexed = self.values[id(record)]
+            if value is indexed or (type(value) is type(indexed) and value == indexed):
+                return
+            self.discard(record)
+        self.add(record)
+
+    def lookup(self, value):
+        '''The records that hold 'value', None if the value is unhashable'''
+        try:
+            bucket = self.buckets.get(value)
+        except TypeError:
+            return None
+        return list(bucket.values()) if bucket else []
+
+    def between(self, low=None, high=None):
+        '''The records with a value from 'low' to 'high' (inclusive), ordered by value and position in the list'''
+        start = 0 if low is None else bisect.bisect_left(self.order, low)
+        stop = len(self.order) if high is None else bisect.bisect_right(self.order, high)
+        records = []
+        for value in self.order[start:stop]:
+            records.extend(sorted(self.buckets[value].values(), key=lambda record: record.key))
+        return records
+
+
+# -------------------------------------------------------------------------------------------------------- Stats Class
+# Counts and timings of the operations of Dicta (see Dicta.set_stats()). Every operation keeps its count,
+# total and maximum time and the bytes it wrote or read. Percentiles are computed from the latest timings.
+# Operations are recorded by the modifying thread and by the background writer, so recording is locked.
+class Stats():
+    samples = 1024
+
+    def __init__(self, hook=None):
+        self.hook = hook
+        self.lock = threading.Lock()
+        self.operations = {}
+
+    def record(self, name, seconds, size=0):
+        with self.lock:
+            operation = self.operations.get(name)
+            if operation is None:
+                operation = self.operations[name] = {"count": 0, "total": 0.0, "max": 0.0, "bytes": 0, "samples": collections.deque(maxlen=self.samples)}
+            operation["count"] += 1
+            operation["total"] += seconds
+            operation["bytes"] += size
+            operation["samples"].append(seconds)
+            if seconds > operation["max"]:
+                operation["max"] = seconds
+        if self.hook is not None:
+            try:
+                self.hook(name, seconds, size)
+            except Exception as e:
+                print("ERROR!: Dicta: Stats hook failed: {}".format(e))
+
+    def report(self, reset=False):
+        with self.lock:
+            operations = self.operations
+            if reset:
+                self.operations = {}
+            else:
+                operations = {name: dict(operation, samples=list(operation["samples"])) for name, operation in operations.items()}
+        report = {}
+        for name, operation in sorted(operations.items()):
+            samples = sorted(operation["samples"])
+            report[name] = {
+                "count": operation["count"],
+                "total": operation["total"],
+                "mean": operation["total"] / operation["count"],
+                "max": operation["max"],
+                "p50": self.__percentile(samples, 50),
+                "p90": self.__percentile(samples, 90),
+                "p99": self.__percentile(samples, 99),
+                "bytes": operation["bytes"],
+            }
+        return report
+
+    def __percentile(self, samples, percent):
+        # nearest rank
+        return samples[max(0, -(-len(samples) * percent // 100) - 1)]
+
+
+# -------------------------------------------------------------------------------------------------------- Dicta Class
+class Dicta(dict, ChildConverter, DictUpdater):
+    '''
+    A dict subclass that observes a nested dict and listens for changes in its data 
+    structure. If a data change is registered, Dicta reacts with a callback 
+    or a data-export to a JSON file.
+
+    Automatically write data to a JSON file, when the nested data structure changes (optional)
+    Throw a callback method, when the nested data structure changes (optional)
+
+    Behaves like a regular dict and supports all dict and list methods like pop(), append(), slice()...
+    Supports nesting of all possible datatypes like dict, list, tuple, set and other objects like custom classes.
+    Writing data to a file will encode a non-serializable object to a binary-string.
+    Reading data from a file will decode a binary-string back to a non-serializable object.
+    You can import additional data from json files.
+    You can export data to json files.
+    
+    How to use:
+    data = Dicta()
+    data = Dicta(dict)
+    '''
+    
+    # --------------------------------- Private Methods
+    def __init__(self, *args, **kwargs):
+        self.path = None
+        self.version = 0
+        self.__synced_version = 0
+        self.__sync_lock = threading.RLock()
+        self.__writer = None
+        self.__storage = "snapshot"
+        self.__journal = None
+        self.__file_lock = None
+        self.__generation = 0
+        self.__conflict = "reload"
+        self.__unsynced_patches = []
+        self.__batch_depth = 0
+        self.__batch_events = []
+        self.__batch_journal = []
+        self.callback = None
+        self.get_event = False
+        self.binary_serializer = False
+        self.serializer_hook = default_serializer_hook
+        self.backend = backends["json"]
+        self.compression = "auto"
+        self.compression_level = None
+        self.lazy = False
+        self.lock = None
+        self.__stats = None
+        self.__subscriptions = SubscriptionIndex()
+        self.__indexes = {}
+        self.__index_lock = threading.Lock()
+        self.__history = None
+        self.__history_limit = 100
+        self.load(dict(*args, **kwargs), notify=False)
+
+    def __lock__(self):
+        return self.lock
+
+    # Copies (copy.copy(), copy.deepcopy()) and unpickled objects hold the data and the settings. The bindings 
+    # (file, callback, subscriptions, indexes, history, stats) and the runtime state (locks, writers, caches) 
+    # belong to the original and are not copied.
+    @read_synchronized
+    def __reduce__(self):
+        settings = {
+            "binary_serializer": self.binary_serializer,
+            "serializer_hook": self.serializer_hook,
+            "backend": self.backend.name,
+            "compression": self.compression,
+            "compression_level": self.compression_level,
+            "lazy": self.lazy,
+            "thread_safe": self.lock is not None
+        }
+        return (self.__class__, (self.__rewrite_recursively__(init=True), ), settings)
+
+    def __setstate__(self, settings):
+        self.set_serializer(settings["binary_serializer"], settings["serializer_hook"])
+        self.set_backend(settings["backend"])
+        self.set_compression(settings["compression"], settings["compression_level"])
+        self.set_lazy(settings["lazy"])
+        self.set_thread_safe(settings["thread_safe"])
+
+    def __call_from_child__(self, object_after_modification, modify_info, data_tree):
+        data_tree.insert(0, self)
+        modify_info["data_tree"] = data_tree
+        self.__on_change(modify_info)
+
+    # Count the modification. Export the data and throw the callback, or collect the event while a batch is open
+    def __on_change(self, modify_info):
+        start = time.perf_counter() if self.__stats else 0
+        self.version += 1
+        if self.__indexes:
+            self.__update_indexes(modify_info)
+        # the path and the patch are only built if they are consumed
+        if self.get_event or self.__journal is not None or self.__file_lock is not None or (self.__subscriptions.count and self.__subscribed(modify_info)):
+            self.__describe(modify_info)
+        if self.__journal is not None and self.path:
+            self.__record_journal(modify_info)
+        if self.__file_lock is not None and self.__conflict == "reload" and self.path:
+            # reapplied if another process modified the sync file before they are written
+            self.__unsynced_patches.extend(self.__encode_patches(modify_info))
+        if self.__batch_depth:
+            self.__batch_events.append(modify_info)
+        else:
+            self.__sync(modify_info)
+        if self.__stats:
+            self.__stats.record("mutation." + modify_info["mode"], time.perf_counter() - start)
+
+    def __describe(self, modify_info):
+        obj = modify_info["object_after_modification"]
+        modify_info["path"] = obj.__pointer__() if isinstance(obj, ParentCaller) else ""
+        modify_info["patch"] = self.__patch(modify_info)
+
+    def __sync(self, modify_info):
+        if hasattr(self, 'path') and self.path and isinstance(self.path, str):
+            if self.__journal is not None and self.__journal_needs_compaction():
+                self.__compact_journal()
+            if self.__writer:
+                self.__writer.notify()
+            else:
+                self.__write_sync_file()
+        self.__callback(modify_info)
+
+    def __callback(self, modify_info):
+        if hasattr(self, 'callback') and self.callback:
+            start = time.perf_counter() if self.__stats else 0
+            if self.get_event:
+                # events of a batch that was opened before the callback was bound are not described yet
+                for event in modify_info.get("events", ()):
+                    if "patch" not in event:
+                        self.__describe(event)
+                if modify_info["mode"] != "batch":
+                    modify_info = Event(modify_info, BeforeStates([modify_info]), 0)
+                if isinstance(self.callback, AsyncCallback):
+                    # an async callback reads the event after later modifications
+                    for event in reversed(modify_info.get("events", ())):
+                        event.restore()
+                    modify_info.restore()
                 self.callback(modify_info)
             else:
                 self.callback()
-        if hasattr(self, 'path') and self.path and isinstance(self.path, str):
-            self.__export_file(self.path)
+            if self.__stats:
+                self.__stats.record("callback", time.perf_counter() - start)
+        if self.__subscriptions.count:
+            self.__dispatch(modify_info)
+
+    # Pass the event to the subscriptions that match one of its patches, in the order of subscription. 
+    # A batch is passed to a subscription once, with the events that match the subscription.
+    def __dispatch(self, modify_info):
+        if modify_info["mode"] == "batch":
+            matches = {}
+            for event in modify_info["events"]:
+                for number, subscription in self.__match(event).items():
+                    matches.setdefault(number, (subscription, []))[1].append(event)
+            calls = [(matches[number][0], dict(modify_info, events=matches[number][1])) for number in sorted(matches)]
+        elif "patch" not in modify_info:
+            # __on_change describes every event that may match a subscription
+            return
+        else:
+            found = self.__match(modify_info)
+            calls = [(found[number], modify_info) for number in sorted(found)]
+        for subscription, event in calls:
+            start = time.perf_counter() if self.__stats else 0
+            subscription.handler(event)
+            if self.__stats:
+                self.__stats.record("subscription", time.perf_counter() - start)
+
+    def __match(self, modify_info):
+        if "patch" not in modify_info:
+            if not self.__subscribed(modify_info):
+                return {}
+            self.__describe(modify_info)
+        found = {}
+        for patch in modify_info["patch"]:
+            self.__subscriptions.match(patch["path"], found)
+        return found
+
+    # Whether a subscription may match the event, checked along the keys of its data tree
+    # before its path and patch are built
+    def __subscribed(self, modify_info):
+        return self.__subscriptions.reaches(self.__event_tokens(modify_info))
+
+    def __event_tokens(self, modify_info):
+        for node in modify_info.get("data_tree", (self, ))[1:]:
+            token = str(node.key)
+            yield token.replace("~", "~0").replace("/", "~1") if "~" in token or "/" in token else token
+        # the patch of a key of a dict addresses the key (see __patch)
+        if modify_info["mode"] in ("setitem", "delitem", "pop", "setdefault") and isinstance(modify_info["object_after_modification"], dict):
+            yield self.__pointer_token(modify_info["key"])
+
+    def __pointer_token(self, key):
+        return str(key).replace("~", "~0").replace("/", "~1")
+
+    # Translate an event into JSON patch operations (RFC 6902)
+    def __patch(self, modify_info):
+        obj = modify_info["object_after_modification"]
+        path = modify_info["path"]
+        mode = modify_info["mode"]
+        undo = modify_info.get("undo")
+        if undo is None:
+            return []
+        if isinstance(obj, dict):
+            if mode in ("setitem", "setdefault"):
+                op = "add" if undo.action == "delete" else "replace"
+                return [{"op": op, "path": path + "/" + self.__pointer_token(undo.key), "value": obj[undo.key]}]
+            elif mode in ("delitem", "pop", "popitem"):
+                return [{"op": "remove", "path": path + "/" + self.__pointer_token(undo.key)}]
+            elif mode == "loaded":
+                added = set(undo.key)
+                return [{"op": "add" if key in added else "replace", "path": path + "/" + self.__pointer_token(key), "value": obj[key]} for key in modify_info["keys"]]
+        elif isinstance(obj, (list, array.array)):
+            if mode in ("append", "insert"):
+                return [{"op": "add", "path": path + "/" + str(undo.key), "value": obj[undo.key]}]
+            elif mode in ("extend", "frombytes") or (mode == "imul" and undo.action == "delete"):
+                return [{"op": "add", "path": path + "/-", "value": item} for item in obj[undo.key]]
+            elif mode in ("delitem", "pop", "remove") and undo.action == "insert" and len(undo.value) == 1:
+                return [{"op": "remove", "path": path + "/" + str(undo.key)}]
+            elif mode == "setitem" and not isinstance(undo.key, slice):
+                index = undo.key % len(obj)
+                return [{"op": "replace", "path": path + "/" + str(index), "value": obj[index]}]
+        # every other modification replaces the object as a whole
+        return [{"op": "replace", "path": path, "value": obj}]
+
+    @contextlib.contextmanager
+    def __batch(self, rollback):
+        # a thread safe Dicta is locked for the whole block, so no other thread modifies the data meanwhile
+        with self.lock.write() if self.lock else contextlib.nullcontext():
+            with self.__batch_block(rollback):
+                yield self
+
+    @contextlib.contextmanager
+    def __batch_block(self, rollback):
+        if not self.__batch_depth:
+            self.__batch_events = []
+            self.__batch_journal = []
+        first_event = len(self.__batch_events)
+        first_record = len(self.__batch_journal)
+        first_patch = len(self.__unsynced_patches)
+        backup = self.dictify() if rollback else None
+        self.__batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            if rollback:
+                self.__detach_childs__(self.values())
+                super(Dicta, self).clear()
+                self.load(backup, notify=False)
+                del self.__batch_events[first_event:]
+                # the rolled back modifications must not reach the journal or be reapplied on reload
+                del self.__batch_journal[first_record:]
+                del self.__unsynced_patches[first_patch:]
+            raise
+        finally:
+            self.__batch_depth -= 1
+            if not self.__batch_depth:
+                self.__close_batch()
+
+    def __close_batch(self):
+        events = self.__batch_events
+        self.__batch_events = []
+        records = self.__batch_journal
+        self.__batch_journal = []
+        if records and self.__journal is not None:
+            self.__buffer_journal(records)
+        if not events:
+            return
+        start = time.perf_counter() if self.__stats else 0
+        modify_info = {
+            "type": type(self),
+            "mode": "batch",
+            "events": events,
+            "object_after_modification": self
+        }
+        if self.callback and self.get_event:
+            # the states before the modifications are only restored if the callback reads them
+            states = BeforeStates(events)
+            modify_info["events"] = [Event(event, states, position) for position, event in enumerate(events)]
+            modify_info = Event(modify_info, states, 0)
+        self.__sync(modify_info)
+        if self.__stats:
+            self.__stats.record("mutation.batch", time.perf_counter() - start)
+
+    @synchronized
+    def __setitem__(self, key, val):
+        if self.__is_child__(key, val):
+            return
+        self.__set_child(key, self.__convert_child__(val, key), val)
+
+    # Set an already converted child
+    @synchronized
+    def __set_child(self, key, child, val):
+        if key in self:
+            old = self[key]
+            undo = UndoRecord("set", key, old)
+            self.__detach_child__(old)
+        else:
+            undo = UndoRecord("delete", key)
+        super(Dicta, self).__setitem__(key, child)
+        modify_info = {
+            "type": type(self),
+            "mode": "setitem",
+            "key": key,
+            "value": val,
+            "undo": undo,
+            "object_after_modification": self
+        }
+        self.__on_change(modify_info)
 
+    @synchronized
     def __delitem__(self, key):
-        object_before_modification = self.copy()
+        old = self[key]
         super(Dicta, self).__delitem__(key)
-        if self.get_event:
-            modify_info = {
-                "type": type(self),
-                "mode": "delitem",
-                "key": key,
-                "object_before_modification": object_before_modification,
-                "object_after_modification": self
-            }
-            self.callback(modify_info)
-        else:
-            self.callback()
+        self.__detach_child__(old)
+        modify_info = {
+            "type": type(self),
+            "mode": "delitem",
+            "key": key,
+            "undo": UndoRecord("set", key, old),
+            "object_after_modification": self
+        }
+        self.__on_change(modify_info)
 
     def __rewrite_recursively__(self, obj=None, new=None, init=False):
         if init:
             obj=self
         if not new:
             new={}
+        # the base class methods don't wrap the childs of lazy objects
         if isinstance(obj, dict):
             new = dict()
-            for key, value in obj.items():
+            for key, value in dict.items(obj):
                 new[key] = self.__rewrite_recursively__(value, new)
         elif isinstance(obj, list):
             new = list()
-            for i in range(len(obj)):
-                new.append(self.__rewrite_recursively__(obj[i], new))
+            for value in list.__iter__(obj):
+                new.append(self.__rewrite_recursively__(value, new))
         elif isinstance(obj, tuple):
             l = []
-            for i in range(len(obj)):
-                l.append(self.__rewrite_recursively__(obj[i], new))
+            for value in tuple.__iter__(obj):
+                l.append(self.__rewrite_recursively__(value, new))
             new = tuple(l)
         elif isinstance(obj, set):
             new = set(obj)
+        elif isinstance(obj, array_types):
+            new = copy_array(obj)
         else:
             new = obj
         return new
     
-    def __serialize__(self):
-        if self.binary_serializer:
-            dict_str = Serializer(self.serializer_hook).encode(self.dictify())
+    # Cached fragments never contain serialized objects (see json_types). Fragments of sets and tuples depend on
+    # the encoder (pickled, redacted or tagged), they are only reused by the encoder they were encoded with.
+    def __serialize__(self, redact=False):
+        return self.__encode__(self, self.__json_encoder(redact))
+
+    def __stream__(self, redact=False):
+        return self.__iterencode__(self, self.__json_encoder(redact))
+
+    def __json_encoder(self, redact):
+        if self.binary_serializer and redact:
+            return RedactingSerializer(self.serializer_hook)
+        elif self.binary_serializer:
+            return Serializer(self.serializer_hook)
+        return json.JSONEncoder(default=encode_array)
+
+    # Incremental serialization. The result equals json.dumps() of the data, but nested objects are 
+    # only encoded if they (or one of their childs) were modified since they were encoded the last time.
+    # The cached fragments of all other objects are spliced in.
+    def __encode__(self, obj, encoder):
+        return self.__encode_fragment__(obj, encoder)[0]
+
+    # Returns the fragment, whether it may be cached and whether it depends on the encoder
+    def __encode_fragment__(self, obj, encoder):
+        if isinstance(obj, ParentCaller):
+            version = obj.version
+            cached = obj.fragment
+            if cached is not None and cached[0] == version:
+                owner = cached[2]
+                if owner is None or owner is type(encoder):
+                    return cached[1], True, owner is not None
+        if isinstance(obj, array_types):
+            # typed arrays only hold numbers, they are encoded from the buffer without checking the items
+            fragment = json.JSONEncoder.encode(encoder, tag_array(obj) if isinstance(encoder, Serializer) else obj.tolist())
+            cacheable = True
+            dependent = True
+        elif isinstance(obj, set):
+            fragment = encoder.encode(set(obj))
+            cacheable = all(type(item) in json_types for item in obj)
+            dependent = True
         else:
-            dict_str = json.dumps(self.dictify())
-        return dict_str
+            nested = False
+            cacheable = True
+            # tagged tuples depend on the encoder, plain containers (childs of lazy objects) may hold tuples and sets
+            dependent = isinstance(obj, tuple)
+            for value in self.__childs__(obj):
+                if type(value) not in json_types:
+                    if isinstance(value, ParentCaller):
+                        nested = True
+                        break
+                    if type(value) not in plain_types:
+                        cacheable = False
+                    dependent = True
+            if not nested:
+                # let the C encoder encode the whole object at once. It calls items() of dict subclasses,
+                # which would convert all childs of a lazy object.
+                fragment = encoder.encode(dict(obj) if isinstance(obj, LazyNestedDict) else obj)
+            else:
+                cacheable = True
+                encoder_type = type(encoder)
+                parts = []
+                append = parts.append
+                for value in self.__childs__(obj):
+                    if isinstance(value, ParentCaller):
+                        cached = value.fragment
+                        if cached is not None and cached[0] == value.version and cached[2] is None:
+                            append(cached[1])
+                        elif cached is not None and cached[0] == value.version and cached[2] is encoder_type:
+                            append(cached[1])
+                            dependent = True
+                        else:
+                            part, part_cacheable, part_dependent = self.__encode_fragment__(value, encoder)
+                            append(part)
+                            cacheable = cacheable and part_cacheable
+                            dependent = dependent or part_dependent
+                    else:
+                        append(encoder.encode(value))
+                        cacheable = cacheable and (type(value) in json_types or type(value) in plain_types)
+                        dependent = dependent or type(value) not in json_types
+                if isinstance(obj, dict):
+                    fragment = "{" + ", ".join([self.__encode_key__(key, encoder) + ": " + part for key, part in zip(dict.keys(obj), parts)]) + "}"
+                else:
+                    fragment = "[" + ", ".join(parts) + "]"
+                    if isinstance(obj, tuple) and isinstance(encoder, Serializer):
+                        fragment = "{" + encoder.encode(tuple_tag) + ": " + fragment + "}"
+        if cacheable and isinstance(obj, ParentCaller):
+            obj.fragment = (version, fragment, type(encoder) if dependent else None)
+        return fragment, cacheable, dependent
 
-    def __deserialize__(self, obj):
+    # Streaming serialization (see JSONBackend.iterencode()). Yields the same JSON as __encode__() in chunks.
+    # Objects with nested objects are encoded child by child, so the whole document is never held in memory
+    # at once. Returns like __encode_fragment__() whether the object may be cached and whether it depends on 
+    # the encoder, and the fragment of the object if it is smaller than 'cache_size'. Small objects are cached, 
+    # so they are not encoded again by the next write.
+    def __iterencode__(self, obj, encoder, cache_size=65536):
+        if isinstance(obj, ParentCaller):
+            version = obj.version
+            cached = obj.fragment
+            if cached is not None and cached[0] == version and (cached[2] is None or cached[2] is type(encoder)):
+                yield cached[1]
+                return True, cached[2] is not None, cached[1]
+        if isinstance(obj, (set, tuple) + array_types) or not any(isinstance(value, ParentCaller) for value in self.__childs__(obj)):
+            fragment, cacheable, dependent = self.__encode_fragment__(obj, encoder)
+            yield fragment
+            return cacheable, dependent, fragment
+        cacheable = True
+        dependent = False
+        # the chunks of the object as long as it is small enough to be cached
+        parts = []
+        size = 0
+        is_dict = isinstance(obj, dict)
+        keys = iter(dict.keys(obj)) if is_dict else None
+        separator = "{" if is_dict else "["
+        for value in self.__childs__(obj):
+            chunk = separator + self.__encode_key__(next(keys), encoder) + ": " if is_dict else separator
+            separator = ", "
+            yield chunk
+            if isinstance(value, ParentCaller):
+                child_cacheable, child_dependent, fragment = yield from self.__iterencode__(value, encoder, cache_size)
+                cacheable = cacheable and child_cacheable
+                dependent = dependent or child_dependent
+            else:
+                fragment = encoder.encode(value)
+                yield fragment
+                cacheable = cacheable and (type(value) in json_types or type(value) in plain_types)
+                dependent = dependent or type(value) not in json_types
+            if parts is not None and fragment is not None and size < cache_size:
+                parts.append(chunk)
+                parts.append(fragment)
+                size += len(chunk) + len(fragment)
+            else:
+                parts = None
+        yield "}" if is_dict else "]"
+        if parts is None or size >= cache_size:
+            return cacheable, dependent, None
+        parts.append("}" if is_dict else "]")
+        fragment = "".join(parts)
+        if cacheable and isinstance(obj, ParentCaller):
+            obj.fragment = (version, fragment, type(encoder) if dependent else None)
+        return cacheable, dependent, fragment
+
+    def __encode_key__(self, key, encoder):
+        if isinstance(key, str):
+            return encoder.encode(key)
+        # json converts keys of other types (int, float, bool, None) to strings
+        return encoder.encode({key: None})[1:-7]
+
+    # The childs of an object, without converting the childs of lazy objects
+    def __childs__(self, obj):
         if isinstance(obj, dict):
-            for key, val in obj.items():
-                if isinstance(val, dict) or isinstance(val, list) or isinstance(val, tuple):
-                    obj[key] = self.__deserialize__(val)
-                if isinstance(val, dict) and self.serializer_hook in val:
-                    obj[key] = pickle.loads(val[self.serializer_hook].encode('latin-1'))
-        if isinstance(obj, list) or isinstance(obj, tuple):
-            for i in range(len(obj)):
-                if isinstance(obj[i], dict) or isinstance(obj[i], list) or isinstance(obj[i], tuple):
-                    obj[i] = self.__deserialize__(obj[i])
+            return dict.values(obj)
+        elif isinstance(obj, list):
+            return list.__iter__(obj)
+        elif isinstance(obj, array_types):
+            # the numbers of typed arrays are no childs
+            return ()
         return obj
 
-    def __import_file(self, path):
-        if os.path.exists(path):
-            with open(path) as f:
-                if self.binary_serializer:
-                    data = json.load(f, object_hook=self.__deserialize__)
-                else:
-                    data = json.load(f)
-                f.close()
-            self.update(**data)
+    def __clear_fragments__(self, obj):
+        for value in self.__childs__(obj):
+            if isinstance(value, ParentCaller):
+                value.fragment = None
+                if not isinstance(value, set):
+                    self.__clear_fragments__(value)
+
+    # Object hook of the JSON decoder for binary serialization. The decoder calls it once per object, 
+    # innermost objects first, so the childs of an object are decoded already.
+    def __deserialize__(self, obj):
+        if len(obj) == 1:
+            if self.serializer_hook in obj:
+                return pickle.loads(obj[self.serializer_hook].encode('latin-1'))
+            value = obj.get(tuple_tag)
+            if type(value) is list:
+                return tuple(value)
+            value = obj.get(set_tag)
+            if type(value) is list:
+                return set(value)
+            value = obj.get(array_tag)
+            if type(value) is list and len(value) == 2 and type(value[0]) is str:
+                return make_array(value[0], value[1])
+        return obj
+
+    # Decode plain data (e.g. decoded by orjson) like the object hook does, in a single pass
+    def __deserialize_data__(self, obj):
+        if type(obj) is dict:
+            for key, value in obj.items():
+                if type(value) is dict or type(value) is list:
+                    obj[key] = self.__deserialize_data__(value)
+            return self.__deserialize__(obj)
+        elif type(obj) is list:
+            for i, value in enumerate(obj):
+                if type(value) is dict or type(value) is list:
+                    obj[i] = self.__deserialize_data__(value)
+        return obj
+
+    def __decoder(self):
+        if self.binary_serializer:
+            return json.JSONDecoder(object_hook=self.__deserialize__)
+        return json.JSONDecoder()
+
+    def __chunks(self, iterable, chunk_size):
+        chunk = []
+        for item in iterable:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    # Fill a new list before it is added to the tree, like __convert_child__ does
+    def __extend_silently(self, node, items):
+        if isinstance(node, LazyNestedList):
+            list.extend(node, items)
         else:
+            start = len(node)
+            list.extend(node, [node.__convert_child__(item, start + i, False) for i, item in enumerate(items)])
+
+    # A list is read item by item and added with one event when it is complete. Other values 
+    # of the object are read as a whole and added like by update().
+    def __import_stream(self, path, chunk_size):
+        with self.__open_file(path, text=True) as f:
+            stream = JSONStream(f, self.__deserialize__ if self.binary_serializer else None)
+            if stream.peek() != "{":
+                raise ValueError("Dicta.pull(): File '{}' contains no JSON object.".format(path))
+            for key in stream.members():
+                if stream.peek() == "[":
+                    child = self.__convert_child__([], key)
+                    for items in self.__chunks(stream.items(), chunk_size):
+                        self.__extend_silently(child, items)
+                    self.__set_child(key, child, child)
+                else:
+                    self[key] = stream.value()
+
+    # Every line of a JSON Lines file is a record. The records are merged into Dicta (key=None) 
+    # or the dict at 'key', or they are appended to the list at 'key'.
+    def __import_lines(self, path, key, chunk_size):
+        with self.__open_file(path, text=True) as f:
+            decoder = self.__decoder()
+            records = (decoder.decode(line) for line in f if line.strip())
+            target = self if key is None else dict.get(self, key)
+            if isinstance(target, dict):
+                for record in records:
+                    target.update(record)
+            elif isinstance(target, list):
+                for items in self.__chunks(records, chunk_size):
+                    target.extend(items)
+            else:
+                child = self.__convert_child__([], key)
+                for items in self.__chunks(records, chunk_size):
+                    self.__extend_silently(child, items)
+                self.__set_child(key, child, child)
+
+    def __import_file(self, path, stream=False, key=None, chunk_size=1000):
+        if not os.path.exists(path):
             print("Dicta.importFile(): File '{}' does not exist.".format(path))
+        elif self.__strip_compression(path).endswith(".jsonl"):
+            # the members and records are added one by one, but written and passed to the callback at once
+            with self.batch():
+                self.__import_lines(path, key, chunk_size)
+        elif stream and not self.__file_backend(path).binary:
+            with self.batch():
+                self.__import_stream(path, chunk_size)
+        else:
+            self.load(self.__read_file(path))
+
+    # The backend of the format of a file. JSON files are read with the backend in use, if it is a JSON backend.
+    def __file_backend(self, path, head=None):
+        if head is None:
+            with self.__open_file(path) as f:
+                head = f.read(len(BinaryBackend.magic))
+        if self.backend.detect(head):
+            return self.backend
+        for backend in backends.values():
+            if backend.detect(head):
+                return backend
+
+    # --------------------------------- Compression
+    # Files are compressed by the compression that is set (see set_compression()) or, in "auto" mode, 
+    # by the compression of their file extension. Reading detects the compression of a file by its first bytes.
+    def __file_compression(self, path):
+        if self.compression == "auto":
+            for compression in compressions.values():
+                if path.endswith(compression.extensions):
+                    return compression
+            return None
+        return compressions.get(self.compression)
+
+    def __strip_compression(self, path):
+        for compression in compressions.values():
+            for extension in compression.extensions:
+                if path.endswith(extension):
+                    return path[:-len(extension)]
+        return path
+
+    # Open a file for reading (binary or text). Compressed files are decompressed while they are read.
+    @contextlib.contextmanager
+    def __open_file(self, path, text=False):
+        with open(path, 'rb') as f:
+            head = f.read(8)
+            f.seek(0)
+            compression = next((compression for compression in compressions.values() if compression.detect(head)), None)
+            with compression.wrap(f, 'rb') if compression else contextlib.nullcontext(f) as data:
+                if not text:
+                    yield data
+                    return
+                text_file = io.TextIOWrapper(data, encoding="utf-8")
+                try:
+                    yield text_file
+                finally:
+                    # the wrapped file is closed by its own context
+                    text_file.detach()
+
+    def __read_file(self, path):
+        start = time.perf_counter() if self.__stats else 0
+        with self.__open_file(path) as f:
+            data = f.read()
+        decoded = self.__file_backend(path, data).decode(data, self)
+        if self.__stats:
+            self.__stats.record("read", time.perf_counter() - start, len(data))
+        return decoded
     
-    def __export_file(self, path, reset=True):
-        if reset:
-            self.__clear_file(path)
-        dict_str = self.__serialize__()
-        with open(path, 'w') as f:
-            f.write(dict_str)
-            f.close()
+    # The data is only serialized if there are modifications that are not written to the sync file yet
+    @read_synchronized
+    def __write_sync_file(self):
+        if self.__journal is not None:
+            self.__write_journal()
+            return
+        with self.__file_lock.lock() if self.__file_lock else contextlib.nullcontext():
+            with self.__sync_lock:
+                version = self.version
+                if not self.path or version == self.__synced_version:
+                    return
+                if self.__file_lock is not None:
+                    self.__check_generation()
+                    version = self.version
+                # the background writer serializes while the data may be modified; a modification
+                # during serialization is retried, any later one marks the data dirty again
+                self.__save(self.path, fsync=self.__writer is not None or self.__file_lock is not None, concurrent=self.__writer is not None)
+                if self.__file_lock is not None:
+                    self.__generation += 1
+                    self.__file_lock.set_generation(self.__generation)
+                    self.__unsynced_patches = []
+                self.__synced_version = version
+
+    # --------------------------------- Shared Sync File
+    # A shared sync file may be written by other processes (see bind_file(path, shared=True)).
+    # Before writing it, the generation in its lock file is compared with the generation that 
+    # was loaded or written last. The file lock must be held.
+    def __check_generation(self):
+        generation = self.__file_lock.generation()
+        if generation == self.__generation:
+            return
+        if self.__conflict == "raise":
+            raise SyncConflictError("Dicta: Sync file '{}' was modified by another process (generation {}, expected {}).".format(self.path, generation, self.__generation))
+        self.__generation = generation
+        if self.__conflict == "reload":
+            self.__reload_sync_file()
+
+    # Load the data of the sync file and reapply the modifications that were not written yet.
+    # The data is replaced silently and a single 'reload' event is thrown.
+    def __reload_sync_file(self):
+        data = self.__read_file(self.path)
+        for line in self.__unsynced_patches:
+            patch = self.__decode_patch(line)
+            try:
+                data = self.__apply_patch(data, patch)
+            except (KeyError, IndexError, ValueError, TypeError):
+                print("ERROR!: Dicta: Could not reapply '{}' at '{}' to the sync file modified by another process.".format(patch["op"], patch["path"]))
+        self.__unsynced_patches = []
+        undo = UndoRecord("restore", value=dict(self))
+        self.__detach_childs__(dict.values(self))
+        super(Dicta, self).clear()
+        for key, value in data.items():
+            super(Dicta, self).__setitem__(key, self.__convert_child__(value, key))
+        self.version += 1
+        modify_info = {
+            "type": type(self),
+            "mode": "reload",
+            "undo": undo,
+            "object_after_modification": self,
+            "path": "",
+            "patch": [{"op": "replace", "path": "", "value": self}]
+        }
+        self.__callback(modify_info)
+
+    # Data that is serialized in another thread may be modified meanwhile. A modification during 
+    # serialization is retried.
+    @read_synchronized
+    def __encode_data(self, concurrent=False):
+        start = time.perf_counter() if self.__stats else 0
+        for attempt in range(3):
+            try:
+                dict_str = self.backend.encode(self)
+                break
+            except RuntimeError:
+                if not concurrent or attempt == 2:
+                    raise
+        if self.__stats:
+            self.__stats.record("serialize", time.perf_counter() - start, len(dict_str))
+        return dict_str
+
+    def __export_file(self, path, reset=True, concurrent=False):
+        # 'reset' is kept for compatibility. The file is always replaced as a whole.
+        self.__save(path, concurrent=concurrent)
+
+    def __save(self, path, fsync=False, concurrent=False):
+        compression = self.__file_compression(path)
+        if compression is None:
+            self.__write_file(path, self.__encode_data(concurrent), fsync)
+        else:
+            self.__write_compressed(path, compression, fsync, concurrent)
+
+    # Compressed files are written chunk by chunk while the data is encoded (see SerializerBackend.iterencode()),
+    # so the encoded data is never held in memory as a whole. A modification during serialization in 
+    # another thread starts the file over.
+    @read_synchronized
+    def __write_compressed(self, path, compression, fsync=False, concurrent=False):
+        for attempt in range(3):
+            try:
+                self.__write_file(path, self.backend.iterencode(self), fsync, compression)
+                return
+            except RuntimeError:
+                if not concurrent or attempt == 2:
+                    raise
+
+    # Write to a temporary file and replace the target, so the target is never empty or half written.
+    # Compressed files are written from an iterable of chunks (strings or bytes).
+    def __write_file(self, path, data, fsync=False, compression=None):
+        start = time.perf_counter() if self.__stats else 0
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, 'wb' if compression or isinstance(data, bytes) else 'w') as f:
+                if compression is None:
+                    f.write(data)
+                else:
+                    with compression.wrap(f, 'wb', self.compression_level) as compressed:
+                        self.__write_chunks(compressed, [data] if isinstance(data, (str, bytes)) else data)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+                size = f.tell()
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if self.__stats:
+            self.__stats.record("write", time.perf_counter() - start, size)
+
+    # Small chunks are joined, compressors are much faster with few large writes. Large chunks (e.g. cached 
+    # fragments of big objects) are written in slices, so they are not copied as a whole.
+    def __write_chunks(self, f, chunks, buffer_size=65536):
+        buffer = []
+        size = 0
+        for chunk in chunks:
+            if len(chunk) > buffer_size:
+                if buffer:
+                    f.write(b"".join(buffer))
+                    buffer = []
+                    size = 0
+                for i in range(0, len(chunk), buffer_size):
+                    part = chunk[i:i + buffer_size]
+                    f.write(part.encode() if isinstance(part, str) else part)
+                continue
+            buffer.append(chunk.encode() if isinstance(chunk, str) else chunk)
+            size += len(chunk)
+            if size >= buffer_size:
+                f.write(b"".join(buffer))
+                buffer = []
+                size = 0
+        if buffer:
+            f.write(b"".join(buffer))
     
+    # --------------------------------- History
+    # Snapshots of the data for undo(), redo() and at() (see History Classes)
+    def __trim_history(self):
+        history = self.__history
+        excess = len(history.entries) - history.limit
+        if excess > 0:
+            if history.position < excess:
+                # the snapshot of the current data was dropped
+                history.version = None
+            del history.entries[:excess]
+            history.position = max(history.position - excess, 0)
+
+    # Restore the snapshot at the position of the history with a single event. The data that is left 
+    # is the snapshot at 'previous', which is the state before the modification for the callback.
+    def __restore_history(self, mode, previous):
+        history = self.__history
+        version, frozen = history.entries[history.position]
+        self.__restore_snapshot(self, frozen)
+        modify_info = {
+            "type": type(self),
+            "mode": mode,
+            "snapshot": version,
+            "undo": UndoRecord("restore", value=history.entries[previous][1]),
+            "object_after_modification": self
+        }
+        self.__on_change(modify_info)
+        history.version = self.version
+        return version
+
+    # Bring a dict to the state of its snapshot silently. Nested objects whose cached snapshot is part 
+    # of the target are kept, nested dicts are restored key by key, everything else is rebuilt.
+    # Returns whether the dict was modified. Modified nested dicts count the modification in 'version'.
+    def __restore_snapshot(self, node, frozen):
+        modified = False
+        for key in [key for key in dict.keys(node) if key not in frozen]:
+            node.__detach_child__(dict.__getitem__(node, key))
+            dict.__delitem__(node, key)
+            modified = True
+        for key, value in dict.items(frozen):
+            if dict.__contains__(node, key):
+                current = dict.__getitem__(node, key)
+                if self.__is_snapshot(current, value):
+                    continue
+                if isinstance(current, NestedDict) and type(value) is FrozenDict:
+                    modified = self.__restore_snapshot(current, value) or modified
+                    continue
+                node.__detach_child__(current)
+            dict.__setitem__(node, key, node.__convert_child__(thaw(value), key))
+            modified = True
+        if modified and isinstance(node, ParentCaller):
+            node.version += 1
+        return modified
+
+    def __is_snapshot(self, current, frozen):
+        if isinstance(current, ParentCaller):
+            cached = current.snapshot
+            return cached is not None and cached[0] == current.version and cached[1] is frozen
+        return current is frozen or (type(current) in json_types and type(current) is type(frozen) and current == frozen)
+
+    # --------------------------------- Indexes
+    # Record indexes of create_index() are kept up to date by the events of the modifications (see RecordIndex).
+    # The path of a modification (data_tree) passes the indexed list at the depth of the index path: the list
+    # itself or one of its records was modified. A modification of a parent of the list may have replaced or
+    # moved the list, its path is resolved again. If the list at the path is another one, the index is rebuilt
+    # by the next query. Data that is replaced silently (transaction rollback, reload) is noticed by queries.
+    def __index_tokens(self, path):
+        if not isinstance(path, str):
+            raise TypeError("Dicta: An index path must be a path string, got '{}'.".format(type(path).__name__))
+        return [token.replace("~1", "/").replace("~0", "~") for token in path.split("/") if token]
+
+    def __index_path(self, path):
+        return "".join("/" + self.__pointer_token(token) for token in self.__index_tokens(path))
+
+    # The list at a path or None
+    def __resolve_list(self, path):
+        node = self
+        for token in self.__index_tokens(path):
+            try:
+                node = node[token] if isinstance(node, dict) else node[int(token)]
+            except (KeyError, IndexError, ValueError, TypeError):
+                return None
+        return node if isinstance(node, NestedList) else None
+
+    def __update_indexes(self, modify_info):
+        data_tree = modify_info.get("data_tree") or (self, )
+        depth = len(data_tree) - 1
+        for index in self.__indexes.values():
+            node = index.node
+            if node is None:
+                continue
+            if depth > index.depth and data_tree[index.depth] is node:
+                # a record or one of its childs
+                index.update(data_tree[index.depth + 1])
+            elif depth == index.depth and data_tree[-1] is node:
+                self.__update_index_list(index, modify_info)
+            elif depth < index.depth:
+                parent = node
+                for i in range(index.depth - depth):
+                    parent = getattr(parent, "parent", None)
+                if parent is data_tree[-1] and self.__resolve_list(index.path) is not node:
+                    index.node = None
+
+    def __update_index_list(self, index, modify_info):
+        node = index.node
+        mode = modify_info["mode"]
+        undo = modify_info.get("undo")
+        if undo is None or mode in ("reverse", "sort"):
+            return
+        if mode in ("append", "insert"):
+            index.add(node[undo.key])
+        elif mode == "extend" or (mode == "imul" and undo.action == "delete"):
+            for record in node[undo.key]:
+                index.add(record)
+        elif mode in ("delitem", "pop", "remove") and undo.action == "insert":
+            for record in undo.value:
+                index.discard(record)
+        elif mode == "setitem":
+            if isinstance(undo.key, slice):
+                removed, added = undo.value, node[undo.key]
+            else:
+                removed, added = [undo.value], [node[undo.key]]
+            for record in removed:
+                index.discard(record)
+            for record in added:
+                index.add(record)
+        else:
+            index.build(node)
+
+    # The index of a query, rebuilt if the list at its path was replaced. Queries of several threads
+    # may hold the read lock at once, so the index is rebuilt by one of them.
+    def __current_index(self, index, node):
+        if index.node is not node:
+            with self.__index_lock:
+                if index.node is not node:
+                    index.build(node)
+        return index
+
+    def __query_list(self, name, path):
+        node = self.__resolve_list(path)
+        if node is None:
+            raise ValueError("{}() expects the path of a list, there is no list at '{}'.".format(name, path))
+        return node
+
+    # --------------------------------- Journal
+    # In journal storage mode the sync file is a snapshot and every modification is appended to
+    # '<path>.journal' as one JSON patch record per line (JSON Lines). Writing costs O(change)
+    # instead of O(data). When the journal grows too large compared to the snapshot, the snapshot
+    # is rewritten in a background thread and the journal starts over.
+    #
+    # The first line of the journal identifies the snapshot it belongs to (inode, size, mtime).
+    # A journal that doesn't match the snapshot is outdated (e.g. the process died after writing 
+    # a new snapshot but before replacing the journal) and is ignored.
+    def __snapshot_id(self, path):
+        stat = os.stat(path)
+        return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+    # Apply a JSON patch operation to plain data
+    def __apply_patch(self, data, patch):
+        keys = [key.replace("~1", "/").replace("~0", "~") for key in patch["path"].split("/")[1:]]
+        if not keys:
+            return patch["value"]
+        parent = data
+        for key in keys[:-1]:
+            parent = parent[int(key)] if isinstance(parent, list) else parent[key]
+        key = keys[-1]
+        if isinstance(parent, (list, array.array)):
+            key = len(parent) if key == "-" else int(key)
+            if patch["op"] == "add":
+                parent.insert(key, patch["value"])
+                return data
+        if patch["op"] == "remove":
+            del parent[key]
+        else:
+            parent[key] = patch["value"]
+        return data
+
+    # The records are encoded right away, later modifications must not change them
+    # Nested objects are encoded like in the sync file, so a set is pickled without its parents
+    def __encode_patches(self, modify_info):
+        encoder = Serializer(self.serializer_hook) if self.binary_serializer else json.JSONEncoder(default=encode_array)
+        return [self.__encode__(patch, encoder) + "\n" for patch in modify_info["patch"]]
+
+    def __decode_patch(self, line):
+        if self.binary_serializer:
+            return json.loads(line, object_hook=self.__deserialize__)
+        return json.loads(line)
+
+    # The records of a batch are encoded right away, as the patches refer to the live objects, but are 
+    # only buffered when the batch is closed. A rolled back transaction drops them (see __batch_block).
+    def __record_journal(self, modify_info):
+        lines = self.__encode_patches(modify_info)
+        if self.__batch_depth:
+            self.__batch_journal.extend(lines)
+        else:
+            self.__buffer_journal(lines)
+
+    def __buffer_journal(self, lines):
+        journal = self.__journal
+        with journal.lock:
+            journal.buffer.extend(lines)
+            journal.pending += sum(len(line) for line in lines)
+
+    def __read_journal(self, path, data):
+        journal_path = path + ".journal"
+        if not os.path.exists(journal_path):
+            return data
+        with open(journal_path) as f:
+            header = f.readline()
+            if not header or json.loads(header).get("snapshot") != self.__snapshot_id(path):
+                return data
+            for line in f:
+                # a line that is not terminated was cut off by a crash during the write
+                if not line.endswith("\n"):
+                    break
+                data = self.__apply_patch(data, self.__decode_patch(line))
+        return data
+
+    def __write_journal(self):
+        journal = self.__journal
+        with self.__sync_lock:
+            with journal.lock:
+                if journal.compacting or not journal.buffer:
+                    return
+                lines = journal.buffer
+                journal.buffer = []
+                journal.pending = 0
+            journal_str = "".join(lines)
+            start = time.perf_counter() if self.__stats else 0
+            with open(self.path + ".journal", 'a') as f:
+                f.write(journal_str)
+                if self.__writer:
+                    f.flush()
+                    os.fsync(f.fileno())
+            journal.size += len(journal_str)
+            if self.__stats:
+                self.__stats.record("journal", time.perf_counter() - start, len(journal_str))
+
+    def __journal_needs_compaction(self):
+        journal = self.__journal
+        size = journal.size + journal.pending
+        return not journal.compacting and size > max(journal.compact_min_bytes, journal.compact_ratio * journal.snapshot_size)
+
+    # The data is serialized by the modifying thread, so the snapshot matches the recorded modifications exactly.
+    # Writing the files is done in the background. Records of new modifications are kept in the buffer meanwhile.
+    def __compact_journal(self, background=True):
+        journal = self.__journal
+        dict_str = self.backend.encode(self)
+        with journal.lock:
+            journal.buffer = []
+            journal.pending = 0
+            journal.compacting = True
+        if background:
+            threading.Thread(target=self.__write_compaction, args=(self.path, dict_str), name="dicta-journal-compaction").start()
+        else:
+            self.__write_compaction(self.path, dict_str)
+
+    def __write_compaction(self, path, dict_str):
+        journal = self.__journal
+        try:
+            with self.__sync_lock:
+                self.__write_file(path, dict_str, fsync=True, compression=self.__file_compression(path))
+                header = json.dumps({"snapshot": self.__snapshot_id(path)}) + "\n"
+                self.__write_file(path + ".journal", header, fsync=True)
+                journal.size = 0
+                journal.snapshot_size = len(dict_str)
+        finally:
+            with journal.lock:
+                journal.compacting = False
+        self.__write_journal()
+
     def __clear_file(self, path):
         '''Clear a file. Use with care'''
         with open(path, 'w') as f:
@@ -621,69 +3583,62 @@ class Dicta(dict, ChildConverter, DictUpdater):
 
     # --------------------------------- Public Methods
     # Default dict methods
+    @synchronized
     def clear(self):
-        object_before_modification = self.copy()
+        undo = UndoRecord("restore", value=dict(self))
+        self.__detach_childs__(self.values())
         super(Dicta, self).clear()
-        if self.get_event:
-            modify_info = {
-                "type": type(self),
-                "mode": "clear",
-                "object_before_modification": object_before_modification,
-                "object_after_modification": self
-            }
-            self.callback(modify_info)
-        else:
-            self.callback()
+        modify_info = {
+            "type": type(self),
+            "mode": "clear",
+            "undo": undo,
+            "object_after_modification": self
+        }
+        self.__on_change(modify_info)
 
+    @synchronized
     def pop(self, key):
-        object_before_modification = self.copy()
         r = super(Dicta, self).pop(key)
-        if self.get_event:
-            modify_info = {
-                "type": type(self),
-                "mode": "pop",
-                "key": key,
-                "object_before_modification": object_before_modification,
-                "object_after_modification": self
-            }
-            self.callback(modify_info)
-        else:
-            self.callback()
+        self.__detach_child__(r)
+        modify_info = {
+            "type": type(self),
+            "mode": "pop",
+            "key": key,
+            "undo": UndoRecord("set", key, r),
+            "object_after_modification": self
+        }
+        self.__on_change(modify_info)
         return r
 
+    @synchronized
     def popitem(self, key):
-        object_before_modification = self.copy()
         r = super(Dicta, self).popitem(key)
-        if self.get_event:
-            modify_info = {
-                "type": type(self),
-                "mode": "popitem",
-                "key": key,
-                "object_before_modification": object_before_modification,
-                "object_after_modification": self
-            }
-            self.callback(modify_info)
-        else:
-            self.callback()
+        modify_info = {
+            "type": type(self),
+            "mode": "popitem",
+            "key": key,
+            "undo": UndoRecord("set", r[0], r[1]),
+            "object_after_modification": self
+        }
+        self.__on_change(modify_info)
         return r
     
+    @synchronized
     def setdefault(self, key, default=None):
-        object_before_modification = self.copy()
-        r = super(Dicta, self).setdefault(key, default=default)
-        if self.get_event:
-            modify_info = {
-                "type": type(self),
-                "mode": "setdefault",
-                "key": key,
-                "default": default,
-                "object_before_modification": object_before_modification,
-                "object_after_modification": self
-            }
-            self.callback(modify_info)
-        else:
-            self.callback()
+        undo = None if key in self else UndoRecord("delete", key)
+        r = super(Dicta, self).setdefault(key, default if key in self else self.__convert_child__(default, key))
+        modify_info = {
+            "type": type(self),
+            "mode": "setdefault",
+            "key": key,
+            "default": default,
+            "undo": undo,
+            "object_after_modification": self
+        }
+        self.__on_change(modify_info)
         return r
 
+    @synchronized
     def update(self, *args, **kwargs):
         '''Update the data tree with *args and **kwargs
         
@@ -693,54 +3648,441 @@ class Dicta(dict, ChildConverter, DictUpdater):
         '''
         DictUpdater.update(self, *args, **kwargs)
 
+    @synchronized
+    def load(self, data, notify=True):
+        '''Add a dict to the data tree in one pass, like update() but with a single 'loaded' event.
+
+        The childs are converted and added without an event per key. Then the callback is thrown 
+        and the sync file is written once. With notify=False no event is thrown and the sync file 
+        is not written, the data is written with the next modification or Dicta.flush().
+
+        Dicta.load({"persons": [...], "pets": [...]})
+        '''
+        data = dict(data)
+        if not data:
+            return
+        added = []
+        replaced = {}
+        for key, value in data.items():
+            if dict.__contains__(self, key):
+                old = dict.__getitem__(self, key)
+                replaced[key] = old
+                self.__detach_child__(old)
+            else:
+                added.append(key)
+            dict.__setitem__(self, key, self.__convert_child__(value, key))
+        if not notify:
+            self.version += 1
+            return
+        modify_info = {
+            "type": type(self),
+            "mode": "loaded",
+            "keys": list(data),
+            "undo": UndoRecord("merge", added, replaced),
+            "object_after_modification": self
+        }
+        self.__on_change(modify_info)
+
+    def set_history(self, limit=100):
+        '''Keep up to 'limit' snapshots (see snapshot()). limit=0 deactivates the history and drops the snapshots.'''
+        if not isinstance(limit, int) or limit < 0:
+            raise ValueError("set_history() expects a limit >= 0, got '{}'.".format(limit))
+        self.__history_limit = limit
+        if not limit:
+            self.__history = None
+        elif self.__history is None:
+            self.__history = History(limit)
+        else:
+            self.__history.limit = limit
+            self.__trim_history()
+
+    @synchronized
+    def snapshot(self):
+        '''Take a read-only snapshot of the data and add it to the history. Returns the version of the 
+        snapshot (see Dicta.version and Dicta.at()). Snapshots share all nested objects that didn't change 
+        since the previous snapshot, so a snapshot costs time and memory for what changed only. 
+        Snapshots taken after undo() replace the snapshots that could be redone.
+
+        The history keeps 100 snapshots by default, see set_history(). Returns None without taking 
+        a snapshot if the history is deactivated with set_history(0).
+        '''
+        if not self.__history_limit:
+            return None
+        if self.__history is None:
+            self.__history = History(self.__history_limit)
+        history = self.__history
+        if history.version == self.version:
+            # the data is the current entry of the history, which is restored data after undo() and redo()
+            return history.entries[history.position][0]
+        frozen = freeze(self)
+        del history.entries[history.position + 1:]
+        history.entries.append((self.version, frozen))
+        history.position = len(history.entries) - 1
+        history.version = self.version
+        self.__trim_history()
+        return self.version
+
+    @synchronized
+    def undo(self):
+        '''Restore the data of the previous snapshot. Modifications since the last snapshot are 
+        added to the history first, so they can be redone. Returns the version of the restored 
+        snapshot or None if there is no previous snapshot.'''
+        history = self.__history
+        if history is None or not history.entries:
+            return None
+        if history.version != self.version:
+            self.snapshot()
+        if history.position <= 0:
+            return None
+        history.position -= 1
+        return self.__restore_history("undo", history.position + 1)
+
+    @synchronized
+    def redo(self):
+        '''Restore the data of the snapshot that was undone last. Returns the version of the restored 
+        snapshot or None if there is nothing to redo, e.g. because the data was modified after undo().'''
+        history = self.__history
+        if history is None or history.version != self.version or history.position >= len(history.entries) - 1:
+            return None
+        history.position += 1
+        return self.__restore_history("redo", history.position - 1)
+
+    def at(self, version):
+        '''Returns the read-only snapshot of a version (see snapshot()).
+        Raises a KeyError if there is no snapshot of the version in the history.'''
+        if self.__history is not None:
+            for entry_version, frozen in self.__history.entries:
+                if entry_version == version:
+                    return frozen
+        raise KeyError("at(): There is no snapshot of version {}.".format(version))
+
+    @classmethod
+    def from_file(cls, path):
+        '''Returns a new Dicta with the data of a file (JSON or binary, see set_backend()), built in one pass.
+
+        data = Dicta.from_file("my/path.json")
+        '''
+        dicta = cls()
+        dicta.load(dicta.__read_file(path), notify=False)
+        return dicta
+
     # Custom dict methods
     def bind_callback(self, callback):
-        '''Set the callback function'''
-        self.callback = callback
+        '''Set the callback function. 
+        
+        A coroutine function (async def) is awaited on the running event loop. Its events are 
+        queued and passed one after the other in the order of the modifications.
+        '''
+        if inspect.iscoroutinefunction(callback):
+            self.callback = AsyncCallback(callback)
+        else:
+            self.callback = callback
         c = len(inspect.signature(callback).parameters)
         if c == 1:
             self.get_event = True
         elif c > 1:
             raise TypeError("callback() expects 0 or 1 argument(s), got %d. Please bind 'def callback()' or 'def callback(event)' to dicta." % c)
 
-    def bind_file(self, path, reset=False):
-        '''Set the sync file path. Set reset=True if you want to reset the data in the file on startup. Default is False'''
+    @synchronized
+    def subscribe(self, path_pattern, callback):
+        '''Subscribe a callback to the data changes of a path. Any number of callbacks may subscribe.
+
+        The path is a JSON pointer ("/entities/persons"). "*" matches any key or index of a segment
+        ("/entities/*/age"). The callback is called with the event (see bind_callback()) of every change
+        at or below the path and of every change of its parents (e.g. if "/entities" is replaced).
+        A batch is passed once as a 'batch' event that lists the matching events only. 
+        A coroutine function (async def) is awaited on the running event loop.
+
+        Dicta.subscribe("/entities/persons", callback)
+        '''
+        if not isinstance(path_pattern, str):
+            raise TypeError("subscribe() expects a path string, got '{}'.".format(type(path_pattern).__name__))
+        if not callable(callback):
+            raise TypeError("subscribe() expects a callable callback, got '{}'.".format(type(callback).__name__))
+        handler = AsyncCallback(callback) if inspect.iscoroutinefunction(callback) else callback
+        self.__subscriptions.add(path_pattern, callback, handler)
+
+    @synchronized
+    def unsubscribe(self, path_pattern, callback):
+        '''Remove a subscription of Dicta.subscribe(path_pattern, callback)'''
+        if not self.__subscriptions.remove(path_pattern, callback):
+            raise ValueError("unsubscribe(): The callback is not subscribed to '{}'.".format(path_pattern))
+
+    @synchronized
+    def create_index(self, path, field, ordered=False):
+        '''Index the records (dicts) of the list at 'path' by the value of 'field', so find() looks them
+        up in O(1) instead of scanning the list. With ordered=True the values are kept sorted as well,
+        so find_range() costs O(log n) plus the records it returns. The index is kept up to date with
+        every modification of the list and its records.
+
+        The path is a JSON pointer ("/entities/persons"). Records with an unhashable value of the
+        field (e.g. a list) are not indexed, find() scans the list for them.
+
+        Dicta.create_index("/entities/persons", "name")
+        Dicta.create_index("/entities/persons", "age", ordered=True)
+        '''
+        key = (self.__index_path(path), field)
+        node = self.__query_list("create_index", path)
+        index = RecordIndex(key[0], len(self.__index_tokens(path)), field, ordered)
+        index.build(node)
+        self.__indexes[key] = index
+
+    @synchronized
+    def drop_index(self, path, field):
+        '''Remove the index of Dicta.create_index(path, field)'''
+        if self.__indexes.pop((self.__index_path(path), field), None) is None:
+            raise ValueError("drop_index(): There is no index of '{}' at '{}'.".format(field, path))
+
+    @read_synchronized
+    def find(self, path, **conditions):
+        '''Returns the records (dicts) of the list at 'path' whose fields equal all conditions, in the
+        order of the list. The records are looked up in the smallest matching index (see create_index()),
+        the list is scanned if none of the fields is indexed.
+
+        Dicta.find("/entities/persons", name="john")
+        Dicta.find("/entities/persons", name="john", city="Berlin")
+        '''
+        node = self.__query_list("find", path)
+        path = self.__index_path(path)
+        records = None
+        for field, value in conditions.items():
+            index = self.__indexes.get((path, field))
+            if index is None:
+                continue
+            found = self.__current_index(index, node).lookup(value)
+            if found is not None and (records is None or len(found) < len(records)):
+                records = found
+        if records is None:
+            records = list(node)
+        else:
+            records.sort(key=lambda record: record.key)
+        return [record for record in records if isinstance(record, dict) and all(field in record and record[field] == value for field, value in conditions.items())]
+
+    @read_synchronized
+    def find_range(self, path, field, low=None, high=None):
+        '''Returns the records (dicts) of the list at 'path' whose 'field' is from 'low' to 'high'
+        (inclusive, None is unbounded), ordered by the value of the field. Uses the ordered index of
+        the field (see create_index(ordered=True)) or scans the list. Values that can't be compared
+        with the bounds are skipped.
+
+        Dicta.find_range("/entities/persons", "age", 18, 65)
+        '''
+        node = self.__query_list("find_range", path)
+        index = self.__indexes.get((self.__index_path(path), field))
+        if index is not None and index.ordered:
+            return self.__current_index(index, node).between(low, high)
+        found = []
+        for record in node:
+            if not isinstance(record, dict) or field not in record:
+                continue
+            value = record[field]
+            try:
+                if (low is None or low <= value) and (high is None or value <= high):
+                    found.append((value, record))
+            except TypeError:
+                continue
+        try:
+            found.sort(key=lambda item: item[0])
+        except TypeError:
+            pass
+        return [record for value, record in found]
+
+    def batch(self):
+        '''
+        Returns a context manager that coalesces data changes. Inside the block no callback
+        is thrown and the sync file is not written. On exit the data is exported once and
+        the callback is thrown once with a 'batch' event that lists all collected events.
+
+        with Dicta.batch():
+            for item in items:
+                Dicta["list"].append(item)
+        '''
+        return self.__batch(rollback=False)
+
+    def transaction(self):
+        '''
+        Same as Dicta.batch(), but the data is rolled back to its state at the beginning
+        of the block if an exception is raised inside the block. The exception is re-raised.
+        Nested objects are rebuilt on rollback, so references to them taken inside the
+        block are detached from Dicta afterwards.
+        '''
+        return self.__batch(rollback=True)
+
+    def bind_file(self, path, reset=False, write_mode="sync", debounce_ms=100, storage="snapshot", compact_ratio=1.0, compact_min_bytes=1048576, shared=False, on_conflict="reload"):
+        '''
+        Set the sync file path. Set reset=True if you want to reset the data in the file on startup. Default is False
+
+        write_mode="sync" (default) writes the sync file on every data change.
+        write_mode="background" writes the sync file in a background thread, at most once per 'debounce_ms'
+        milliseconds. Use Dicta.flush() to write pending modifications immediately. Pending modifications
+        are written on exit.
+        write_mode="async" writes the sync file from the running event loop, at most once per 'debounce_ms'
+        milliseconds. Serializing and writing is done in the default executor of the loop. Use 
+        'await Dicta.aflush()' to write pending modifications immediately.
+
+        storage="snapshot" (default) rewrites the whole sync file on data change.
+        storage="journal" appends every modification to '<path>.journal' as a JSON patch record. 
+        The sync file is rewritten in the background when the journal is larger than 'compact_min_bytes'
+        and 'compact_ratio' times the sync file.
+
+        shared=True shares the sync file with other processes. Reads and writes are locked with an
+        advisory lock (fcntl) on '<path>.lock', which also stores the generation of the sync file.
+        If another process wrote the sync file since it was loaded or written last, 'on_conflict' decides:
+        "reload" (default) loads the sync file and reapplies the modifications that were not written yet,
+        "overwrite" writes the data anyway (last writer wins), "raise" raises a SyncConflictError.
+        The data of a shared sync file is loaded under the lock and without an event.
+        Use Dicta.lock_file() for read-modify-write across processes.
+        '''
+        if write_mode not in ("sync", "background", "async"):
+            raise ValueError("bind_file() expects write_mode 'sync', 'background' or 'async', got '%s'." % write_mode)
+        if storage not in ("snapshot", "journal"):
+            raise ValueError("bind_file() expects storage 'snapshot' or 'journal', got '%s'." % storage)
+        if on_conflict not in ("reload", "overwrite", "raise"):
+            raise ValueError("bind_file() expects on_conflict 'reload', 'overwrite' or 'raise', got '%s'." % on_conflict)
+        if shared and fcntl is None:
+            raise ValueError("bind_file(): Shared sync files require fcntl, which is not available on this platform.")
+        if shared and storage == "journal":
+            raise ValueError("bind_file(): Shared sync files don't support storage 'journal'.")
+        if shared and on_conflict == "reload" and write_mode != "sync":
+            # the data can't be reloaded by the writer thread while it's modified
+            raise ValueError("bind_file(): Shared sync files with on_conflict 'reload' require write_mode 'sync'.")
+        if self.__writer:
+            self.__writer.close()
+            self.__writer = None
+        self.__journal = None
+        if write_mode == "background":
+            self.__writer = SyncFileWriter(self.flush, debounce_ms / 1000)
+        elif write_mode == "async":
+            self.__writer = AsyncSyncFileWriter(self.flush, debounce_ms / 1000)
         self.path = path
-        if reset or not os.path.exists(path):
-            self.__clear_file(path)
-        with open(path) as f:
+        self.__synced_version = None
+        self.__file_lock = SyncFileLock(path) if shared else None
+        self.__conflict = on_conflict
+        self.__unsynced_patches = []
+        # a shared sync file is loaded under the lock, without an event and without writing it back: 
+        # another process may write the file as soon as the lock is released
+        with self.__file_lock.lock(exclusive=reset or not os.path.exists(path) or bool(dict.__len__(self))) if shared else contextlib.nullcontext():
+            if reset or not os.path.exists(path):
+                self.__clear_file(path)
+                if shared:
+                    self.__file_lock.set_generation(self.__file_lock.generation() + 1)
             if self.binary_serializer:
                 try:
-                    data = json.load(f, object_hook=self.__deserialize__)
+                    data = self.__read_file(path)
                 except:
                     print("ERROR!: Dicta.bind_file(): Could not set sync file. File '{}' contains no JSON object. Call Dicta.bind_file(path, reset=True) to overwrite file the content or provide a path to another json file.".format(path))
                     data = {}
                     self.path = None
             else:
-                data = json.load(f)
-            f.close()
-        self.update(**data)
+                data = self.__read_file(path)
+            if shared:
+                self.__generation = self.__file_lock.generation()
+                # data that was added before binding the file is written to it right away
+                unsynced = bool(dict.__len__(self))
+                self.load(data, notify=False)
+                self.__synced_version = None if unsynced else self.version
+                if unsynced and self.path:
+                    self.__write_sync_file()
+                return data
+        if storage == "journal" and self.path:
+            data = self.__read_journal(path, data)
+            # the loaded data is written as a new snapshot, instead of journaling every key
+            self.path = None
+            self.load(data)
+            self.path = path
+            self.__journal = SyncJournal(compact_ratio, compact_min_bytes)
+            self.__compact_journal(background=False)
+        else:
+            self.load(data)
         return data
     
-    def pull(self, path=None):
+    @contextlib.contextmanager
+    def lock_file(self):
+        '''
+        Returns a context manager that locks a shared sync file (see bind_file(path, shared=True)) 
+        for the block. The data is reloaded first if another process modified the sync file. 
+        Modifications inside the block are collected like by Dicta.batch() and written before
+        the lock is released, so read-modify-write is safe across processes.
+
+        with Dicta.lock_file():
+            Dicta["count"] += 1
+        '''
+        if self.__file_lock is None:
+            raise ValueError("lock_file() requires a shared sync file. Use Dicta.bind_file(path, shared=True).")
+        # the locks are taken in the same order as by modifications: tree, file, sync file write
+        with self.lock.write() if self.lock else contextlib.nullcontext():
+            with self.__file_lock.lock():
+                with self.__sync_lock:
+                    generation = self.__file_lock.generation()
+                    if generation != self.__generation:
+                        self.__generation = generation
+                        self.__reload_sync_file()
+                with self.batch():
+                    yield self
+
+    def flush(self):
+        '''Write pending modifications to the sync file now. Only needed with bind_file(path, write_mode="background")'''
+        self.__write_sync_file()
+
+    async def aflush(self):
+        '''Write pending modifications to the sync file without blocking the event loop and 
+        wait until the queued events are passed to a coroutine callback'''
+        await asyncio.get_running_loop().run_in_executor(None, self.flush)
+        if isinstance(self.callback, AsyncCallback):
+            await self.callback.join()
+
+    def pull(self, path=None, stream=False, key=None, chunk_size=1000):
         '''
         Pull/Import data from a JSON file into Dicta.
         
         Dicta.pull() >> pulls data from the file that was binded with Dicta.bind_file(path)
         Dicta.pull('my/path.json') >> pulls data from the file at the given path
+        Dicta.pull('my/path.json', stream=True) >> reads the file incrementally, lists are read item by item
+        Dicta.pull('my/path.jsonl', key='records') >> appends every line of a JSON Lines file to the list at 'records'
+
+        Files ending with '.jsonl' are always read line by line. The records are merged into Dicta (key=None),
+        merged into the dict at 'key' or appended to the list at 'key', 'chunk_size' records at a time.
+        Streamed and line by line imports are collected like by Dicta.batch(): one write, one 'batch' event.
         '''
         if path:
-            self.__import_file(path)
+            self.__import_file(path, stream, key, chunk_size)
         elif self.path:
-            self.__import_file(self.path)
+            self.__import_file(self.path, stream, key, chunk_size)
         else:
             print("Dicta.pull(): Please provide path or bind a sync file first. Use Dicta.bind_file(path)")
+
+    async def apull(self, path=None):
+        '''
+        Same as Dicta.pull(), but the file is read and decoded in the default executor of the 
+        running event loop. Only adding the data to Dicta is done on the loop.
+
+        await Dicta.apull('my/path.json')
+        '''
+        path = path or self.path
+        if not path:
+            print("Dicta.apull(): Please provide path or bind a sync file first. Use Dicta.bind_file(path)")
+        elif not os.path.exists(path):
+            print("Dicta.apull(): File '{}' does not exist.".format(path))
+        elif self.__strip_compression(path).endswith(".jsonl"):
+            raise ValueError("Dicta.apull(): JSON Lines files are not supported, use Dicta.pull(path) instead.")
+        else:
+            data = await asyncio.get_running_loop().run_in_executor(None, self.__read_file, path)
+            self.load(data)
     
     def push(self, path, reset=True):
         '''
         Push/Export data to a file. Set reset=True if you want to reset the data in the file at first. Default is True
         '''
         self.__export_file(path, reset)
+
+    async def apush(self, path, reset=True):
+        '''
+        Same as Dicta.push(), but the data is serialized and written in the default executor 
+        of the running event loop, so the loop is not blocked.
+
+        await Dicta.apush('my/path.json')
+        '''
+        await asyncio.get_running_loop().run_in_executor(None, self.__export_file, path, reset, True)
     
     def clear_file(self, path=None):
         '''
@@ -773,28 +4115,22 @@ class Dicta(dict, ChildConverter, DictUpdater):
     # Convert all <NestedSet Classes> to <set classes> before serializing,
     # in order to subclass them correctly with <ParentCaller> while loading them
     # back into Dicta while deserializing.
+    @read_synchronized
     def dictify(self):
         '''Returns a plain dict representation of the data without Dicta functionality'''
         return self.__rewrite_recursively__(init=True)
 
+    @read_synchronized
     def stringify(self, return_binaries=False):
         '''Returns a string representation of the data in Dicta. Use return_binaries=True, if you want to return binary data also. Default is False'''
-        dict_str = self.__serialize__()
-        if not return_binaries and self.serializer_hook in dict_str:
-            hook_positions = [m.start() for m in re.finditer(self.serializer_hook, dict_str)]
-            open_bracket_positions = [m.start() for m in re.finditer("{", dict_str)]
-            closed_bracket_positions = [m.start() for m in re.finditer("}", dict_str)]
-            closed_bracket_positions.reverse()
-            for hook_position in hook_positions:
-                hook_begin = None
-                for open_bracket in open_bracket_positions:
-                    if open_bracket < hook_position:
-                        hook_begin = open_bracket
-                hook_end = None
-                for closed_bracket in closed_bracket_positions:
-                    if closed_bracket > hook_position:
-                        hook_end = closed_bracket
-            dict_str = dict_str.replace(dict_str[hook_begin:hook_end], self.serializer_hook)
+        # the binary format is no string representation, it is represented as JSON
+        backend = backends["json"] if self.backend.binary else self.backend
+        start = time.perf_counter() if self.__stats else 0
+        dict_str = backend.encode(self, redact=not return_binaries)
+        if self.__stats:
+            self.__stats.record("stringify", time.perf_counter() - start, len(dict_str))
+        if isinstance(dict_str, bytes):
+            return dict_str.decode()
         return dict_str
 
     def set_serializer(self, mode=False, serializer_hook=None):
@@ -818,7 +4154,121 @@ class Dicta(dict, ChildConverter, DictUpdater):
             self.serializer_hook = serializer_hook
         else:
             self.serializer_hook = default_serializer_hook
+        # cached fragments were encoded with the previous serializer
+        self.__clear_fragments__(self)
     
+    def set_backend(self, backend="json"):
+        '''Set the format of the files that are written by Dicta (sync file, push()).
+
+        "json" (default): JSON encoded by the standard library
+        "orjson": JSON encoded by orjson, which is much faster (pip install orjson)
+        "binary": a compact binary format. Tuples, sets and bytes are stored as they are and 
+                  non-serializable objects are stored as pickled bytes (see set_serializer()). 
+                  Files in this format are no JSON files.
+
+        The format of a file is detected when it is read (bind_file(), pull()), so files of 
+        every format can be read regardless of the backend in use. 
+        '''
+        if backend not in backends:
+            raise ValueError("set_backend() expects one of {}, got '{}'.".format(", ".join("'%s'" % name for name in backends), backend))
+        if backend == "orjson" and orjson is None:
+            raise ValueError("set_backend(): The 'orjson' backend requires orjson. Install it with 'pip install orjson'.")
+        self.backend = backends[backend]
+
+    def set_compression(self, compression="auto", level=None):
+        '''Set the compression of the files that are written by Dicta (sync file, push()).
+
+        "auto" (default): compress files by their extension: '.gz' (gzip), '.xz' (lzma), '.zz' (zlib),
+                          other files are not compressed
+        "gzip", "lzma", "zlib": compress every file, regardless of its extension
+        None: never compress
+
+        'level' is the compression level (gzip and zlib 0-9, lzma 0-9), default 6. Compressed files are
+        written in chunks while the data is encoded, so the encoded data is never held in memory as a whole.
+        The compression of a file is detected when it is read (bind_file(), pull()), so compressed and
+        uncompressed files can be read regardless of the compression in use.
+        '''
+        if compression is not None and compression != "auto" and compression not in compressions:
+            raise ValueError("set_compression() expects one of 'auto', {} or None, got '{}'.".format(", ".join("'%s'" % name for name in compressions), compression))
+        if compression == "lzma" and lzma is None:
+            raise ValueError("set_compression(): The 'lzma' compression requires a Python build with the lzma module.")
+        if level is not None and (not isinstance(level, int) or not 0 <= level <= 9):
+            raise ValueError("set_compression() expects a level from 0 to 9, got '{}'.".format(level))
+        self.compression = compression
+        self.compression_level = level
+
+    def set_thread_safe(self, mode=True):
+        '''Activate or deactivate thread safety (default=False).
+
+        A thread safe Dicta is locked by a tree-wide reader/writer lock. Modifications hold the write lock 
+        during the modification and its callback and file write, so other threads never see a half done 
+        modification. Serialization (sync file, push(), stringify(), dictify()) holds the read lock. 
+        Many threads may read at once. Dicta.batch() and Dicta.transaction() hold the write lock for the 
+        whole block. Use Dicta.read() to read consistent data across several statements.
+
+        A callback must not wait for another thread that modifies the data, as the callback holds the lock.
+        '''
+        self.lock = ReadWriteLock() if mode else None
+
+    def read(self):
+        '''
+        Returns a context manager that holds the read lock of a thread safe Dicta. The data is not 
+        modified by other threads inside the block. The data must not be modified inside the block.
+
+        with Dicta.read():
+            total = sum(Dicta["counts"])
+        '''
+        return self.lock.read() if self.lock else contextlib.nullcontext()
+
+    def set_lazy(self, mode=True):
+        '''Activate or deactivate lazy conversion (default=False).
+
+        By default all nested dicts, lists, tuples and sets are converted to nested Dicta objects 
+        when they are added. In lazy mode dicts and lists are stored as they are and converted 
+        on their first access. Loading large data (bind_file(), pull()) is fast then and only the 
+        data that is actually used takes the memory of nested objects. 
+        
+        Don't modify a dict or list after adding it to Dicta in lazy mode, as it is not copied.
+        '''
+        self.lazy = bool(mode)
+
+    def set_stats(self, mode=True, hook=None):
+        '''Activate or deactivate the instrumentation (default=False).
+
+        Counts and timings of the operations of Dicta are recorded:
+        "mutation.<mode>": a modification and its processing (callback, sync file write), per mode 
+                           of the event ("setitem", "append", "batch", …)
+        "callback": the callback
+        "subscription": a subscription of Dicta.subscribe()
+        "serialize": serialization of the data for a file (bytes: size of the serialized data)
+        "stringify": Dicta.stringify() (bytes: size of the string)
+        "write": writing a file (bytes: size of the file)
+        "journal": appending to the journal (bytes: size of the records)
+        "read": reading and decoding a file (bytes: size of the file)
+
+        The hook is called with the name of the operation, its time in seconds and its bytes for 
+        every recorded operation, e.g. to pass them to an external metrics system:
+
+        def hook(name, seconds, size):
+            ...
+        '''
+        if hook is not None and not callable(hook):
+            raise TypeError("set_stats() expects a callable hook, got '{}'.".format(type(hook).__name__))
+        self.__stats = Stats(hook) if mode else None
+
+    def stats(self, reset=False):
+        '''Returns the counts and timings per operation (see set_stats()). Times are in seconds.
+        Percentiles are computed from the latest 1024 timings of an operation.
+
+        {"mutation.setitem": {"count": 3, "total": 0.0004, "mean": 0.00013, "max": 0.0002, 
+                              "p50": 0.0001, "p90": 0.0002, "p99": 0.0002, "bytes": 0}, …}
+
+        Use reset=True to start over after reading the stats.
+        '''
+        if self.__stats is None:
+            return {}
+        return self.__stats.report(reset)
+
     # Deprecated Methods
     def import_data(self, *args, **kwargs):
         '''
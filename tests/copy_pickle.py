@@ -0,0 +1,42 @@
+import os
+import sys
+import copy
+import pickle
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import dicta
+
+# Copies and unpickled objects of a Dicta that holds locks, a background writer and a history,
+# and of its nested objects.
+
+errors = []
+
+def check(name, value, expected):
+    if value != expected:
+        errors.append("{}: {!r} != {!r}".format(name, value, expected))
+
+path = os.path.join(tempfile.mkdtemp(), "data.json")
+d = dicta.Dicta(a={"b": [1, (2, 3)], "s": {1, 2}})
+d.set_thread_safe()
+d.set_backend("binary")
+d.bind_file(path, write_mode="background", storage="journal")
+d.create_index("/a/b", "name")
+d.snapshot()
+d["a"]["b"].append(4)
+
+for name, function in (("deepcopy", copy.deepcopy), ("copy", copy.copy), ("pickle", lambda obj: pickle.loads(pickle.dumps(obj)))):
+    c = function(d)
+    check(name, c, d)
+    check(name + " type", type(c), dicta.Dicta)
+    check(name + " settings", (c.backend.name, c.lock is not None, c.path), ("binary", True, None))
+    c["a"]["b"].append(5)
+    check(name + " independent", d["a"]["b"], [1, (2, 3), 4])
+    check(name + " nested", type(c["a"]["s"]), dicta.NestedSet)
+    nested = function(d["a"])
+    check(name + " nested object", (type(nested), nested), (dict, {"b": [1, (2, 3), 4], "s": {1, 2}}))
+
+check("deepcopy nested list", type(copy.deepcopy(d["a"])["b"]), list)
+d.flush()
+print("\n".join(errors) if errors else "ok")
@@ -0,0 +1,62 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import dicta
+
+# Snapshots, undo() and redo() of the history, and a history that was deactivated with set_history(0).
+
+errors = []
+
+def check(name, value, expected):
+    if value != expected:
+        errors.append("{}: {!r} != {!r}".format(name, value, expected))
+
+d = dicta.Dicta(entities={"persons": [{"name": "john", "age": 23}]})
+first = d.snapshot()
+d["entities"]["persons"][0]["age"] = 24
+second = d.snapshot()
+check("undo", d.undo(), first)
+check("age after undo", d["entities"]["persons"][0]["age"], 23)
+check("redo", d.redo(), second)
+check("age after redo", d["entities"]["persons"][0]["age"], 24)
+check("at", d.at(first)["entities"]["persons"][0]["age"], 23)
+
+# after undo() and redo() snapshot() returns the version of the restored entry, without adding one
+d2 = dicta.Dicta(a=1)
+v1 = d2.snapshot()
+d2["a"] = 2
+v2 = d2.snapshot()
+d2.undo()
+check("snapshot after undo", d2.snapshot(), v1)
+check("at after undo", d2.at(d2.snapshot()), {"a": 1})
+d2.redo()
+check("snapshot after redo", d2.snapshot(), v2)
+check("at after redo", d2.at(d2.snapshot()), {"a": 2})
+check("redo after snapshot", d2.undo(), v1)
+
+# a deactivated history stays deactivated
+d.set_history(0)
+check("snapshot without history", d.snapshot(), None)
+d["entities"]["persons"][0]["age"] = 25
+check("snapshot without history", d.snapshot(), None)
+check("undo without history", d.undo(), None)
+check("age without history", d["entities"]["persons"][0]["age"], 25)
+try:
+    d.at(first)
+    errors.append("at(): snapshot of a deactivated history")
+except KeyError:
+    pass
+
+# and is activated again by a limit > 0
+d.set_history(2)
+version = d.snapshot()
+check("snapshot after set_history(2)", version, d.version)
+d["entities"]["persons"][0]["age"] = 26
+d.snapshot()
+d["entities"]["persons"][0]["age"] = 27
+d.snapshot()
+check("limit", d.undo() is not None and d.undo() is None, True)
+
+print("\n".join(errors) if errors else "ok")
@@ -0,0 +1,45 @@
+import os
+import sys
+import json
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import dicta
+
+# Several processes share one sync file. Every process counts up a shared counter
+# with read-modify-write in Dicta.lock_file() and sets its own keys without it.
+# No modification of any process may be lost.
+
+PROCESSES = 4
+ROUNDS = 100
+PATH = "stress_processes.json"
+
+def worker(n):
+    d = dicta.Dicta()
+    d.bind_file(PATH, shared=True)
+    for i in range(ROUNDS):
+        with d.lock_file():
+            d["count"] = d.get("count", 0) + 1
+        d["worker_{}_{}".format(n, i)] = i
+
+if __name__ == "__main__":
+    d = dicta.Dicta()
+    d.bind_file(PATH, reset=True, shared=True)
+    processes = [multiprocessing.Process(target=worker, args=(n, )) for n in range(PROCESSES)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    with open(PATH) as f:
+        data = json.load(f)
+    os.remove(PATH)
+    os.remove(PATH + ".lock")
+    errors = []
+    if data.get("count") != PROCESSES * ROUNDS:
+        errors.append("lost counts: {} != {}".format(data.get("count"), PROCESSES * ROUNDS))
+    missing = [(n, i) for n in range(PROCESSES) for i in range(ROUNDS) if "worker_{}_{}".format(n, i) not in data]
+    if missing:
+        errors.append("lost keys: {}".format(missing[:10]))
+    print("\n".join(errors) if errors else "ok")
@@ -0,0 +1,63 @@
+import os
+import sys
+import json
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import dicta
+
+# Many threads modify a thread safe Dicta at once. Every batch keeps the invariant
+# total == sum(counts), which readers, the callback and the sync file must always see.
+
+THREADS = 8
+ROUNDS = 500
+PATH = "stress_threads.json"
+
+d = dicta.Dicta(counts={}, total=0, log=[])
+d.set_thread_safe(True)
+errors = []
+
+def check(data, where):
+    if data["total"] != sum(data["counts"].values()):
+        errors.append("{}: total {} != {}".format(where, data["total"], sum(data["counts"].values())))
+
+def callback(event):
+    if event["mode"] == "batch":
+        check(d, "callback")
+
+d.bind_callback(callback)
+d.bind_file(PATH, reset=True, write_mode="background", debounce_ms=1)
+d.flush()
+
+def writer(n):
+    for i in range(ROUNDS):
+        with d.batch():
+            d["counts"][str(n)] = d["counts"].get(str(n), 0) + 1
+            d["total"] += 1
+        d["log"].append(n)
+
+def reader():
+    for i in range(ROUNDS):
+        with d.read():
+            check(d, "reader")
+        check(json.loads(d.stringify()), "stringify")
+        with open(PATH) as f:
+            check(json.load(f), "sync file")
+
+threads = [threading.Thread(target=writer, args=(n, )) for n in range(THREADS)]
+threads += [threading.Thread(target=reader) for n in range(2)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+d.flush()
+
+with open(PATH) as f:
+    data = json.load(f)
+os.remove(PATH)
+check(data, "final sync file")
+if data["total"] != THREADS * ROUNDS or len(data["log"]) != THREADS * ROUNDS:
+    errors.append("lost modifications: total {}, log {}".format(data["total"], len(data["log"])))
+
+print("\n".join(errors[:10]) if errors else "ok")